@@ -1,13 +1,17 @@
+import io
 import pandas as pd
 import streamlit as st
-from streamlit_autorefresh import st_autorefresh
 from utils.ui import apply_custom_css, header, sidebar_config, home_page
-from utils.data_fetch import load_tickers, fetch_all_data
-from utils.analytics import portfolio_value_from_prices, compute_portfolio_metrics
+from utils.data_fetch import load_tickers, load_ticker_index, fetch_all_data
+from utils.quotes import live_prices
+from utils.analytics import apply_live_bar, IncrementalPortfolioMetrics
+from utils.ledger import Ledger, read_transactions, position_history
+from utils.indicators import IndicatorState
+from utils.metric_graph import MetricGraph
+from utils.scheduler import TabScheduler
 
 
 st.set_page_config(page_title='Portfolio Analysis Dashboard', layout='wide', initial_sidebar_state="expanded")
-st_autorefresh(interval=15000, key="price_refresh")
 apply_custom_css()
 header()
 sidebar_config()
@@ -24,10 +28,9 @@ tickers_df = load_tickers("Tickers.xlsx")
 if not tickers_df.empty:
     search = st.sidebar.text_input("Search Stocks", placeholder="Search Ticker or Company...")
     if search:
-        s = search.lower()
-        matched = tickers_df[tickers_df.apply(lambda r: s in str(r["Symbol"]).lower() or s in str(r["Company Name"]).lower(), axis=1)]
-        if not matched.empty:
-            sel = st.sidebar.selectbox("Matching Results", matched.apply(lambda r: f"{r['Symbol']} — {r['Company Name']}", axis=1).tolist())
+        matched = load_ticker_index("Tickers.xlsx").search_labels(search)
+        if matched:
+            sel = st.sidebar.selectbox("Matching Results", matched)
             sym = sel.split(" — ")[0]
             if st.sidebar.button("➕ Add Ticker"):
                 if sym not in st.session_state.selected_tickers:
@@ -56,6 +59,19 @@ for t in portfolio:
         date_ranges[t] = (pd.to_datetime(start_end[0]), pd.to_datetime(start_end[1]))
         shares[t] = st.number_input(f"Quantity Held {t}", min_value=0, value=10, step=1)
 
+transactions = None
+transactions_file = st.sidebar.file_uploader("Transactions CSV (Ticker, Date, Quantity, Price)", type="csv")
+if transactions_file is not None:
+    try:
+        transactions = read_transactions(io.BytesIO(transactions_file.getvalue()))
+        transactions = transactions.loc[transactions["Ticker"].isin(portfolio)]
+    except ValueError as e:
+        st.sidebar.error(str(e))
+        transactions = None
+    if transactions is not None:
+        for t, first in Ledger(transactions).first_dates().items():
+            date_ranges[t] = (min(date_ranges[t][0], pd.Timestamp(first)), date_ranges[t][1])
+
 if st.sidebar.button("🚀 Generate Analysis"):
     st.session_state.generated = True
     st.session_state.loaded_data = None
@@ -65,9 +81,12 @@ if not st.session_state.generated:
     st.stop()
     
 if st.session_state.generated:
+    bundle_key = (tuple(portfolio), tuple((t, str(s), str(e)) for t, (s, e) in date_ranges.items()), pd.Timestamp.today().normalize())
     with st.spinner("Fetching & preparing data..."):
-        data_bundle = fetch_all_data(portfolio, date_ranges)
-        st.session_state.loaded_data = data_bundle
+        if st.session_state.get("loaded_data") is None or st.session_state.get("bundle_key") != bundle_key:
+            st.session_state.loaded_data = fetch_all_data(portfolio, date_ranges)
+            st.session_state.bundle_key = bundle_key
+        data_bundle = st.session_state.loaded_data
         retry = data_bundle.get("price_df")
 
         if retry is None or retry.empty:
@@ -75,43 +94,109 @@ if st.session_state.generated:
             st.session_state.generated = False 
             st.stop()
 
-    price_df = st.session_state.loaded_data["price_df"]
+    history_df = st.session_state.loaded_data["price_df"]
     price_dict = st.session_state.loaded_data["price_dict"]
     div_dict = st.session_state.loaded_data["div_dict"]
     buy_price = st.session_state.loaded_data["buy_price"]
     buy_date_actual = st.session_state.loaded_data["buy_date_actual"]
-    latest_price = data_bundle["latest_price"]
     market_df = st.session_state.loaded_data["market_df"]
     missing = st.session_state.loaded_data["missing"]
 
+    if data_bundle.get("failed"):
+        st.warning(f"Yahoo Finance is not responding for: {', '.join(data_bundle['failed'])}. Showing stored data where available; retrying on the next refresh.")
+        st.session_state.bundle_key = None
+
     if missing:
         st.warning(f"No price data for: {', '.join(missing)}. They will be skipped in calculations.")
 
-    valid_tickers = [c for c in price_df.columns if c in portfolio] if not price_df.empty else []
-
-    pf_value = portfolio_value_from_prices(price_df[valid_tickers] if not price_df.empty else pd.DataFrame(), shares)
-    metrics = compute_portfolio_metrics(pf_value,  buy_price=buy_price, latest_price=latest_price, shares=shares, buy_date_actual=buy_date_actual)
-    pf_returns = metrics.get("returns", pd.Series(dtype=float))
-
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["Overview", "Risk Analysis", "Fundamentals Insight", "Dividends & Income", "Report"])
-
-    with tab1:
-        from tabs.overview import overview
-        overview_df = overview(price_df, shares, metrics, buy_price, latest_price, buy_date_actual, valid_tickers, date_ranges, price_dict)
-
-    with tab2:
-        from tabs.risk import risk_analysis
-        risk_analysis_df = risk_analysis(metrics, price_df, valid_tickers, pf_returns, overview_df)
-
-    with tab3:
-        from tabs.fundamentals import fundamental_insights
-        fundamentals_df = fundamental_insights(valid_tickers, latest_price)
-
-    with tab4:
-        from tabs.dividends import dividend_income
-        div_df = dividend_income(valid_tickers, div_dict, date_ranges, buy_price, latest_price, shares)
-
-    with tab5:
-        from tabs.reports import report
-        report(overview_df, risk_analysis_df, fundamentals_df, div_df, pf_returns, metrics)
-
+    valid_tickers = [c for c in history_df.columns if c in portfolio] if not history_df.empty else []
+
+    ledger = Ledger.from_holdings(shares, buy_price, buy_date_actual, date_ranges, history_df)
+    if transactions is not None and not transactions.empty:
+        uploaded = Ledger(transactions)
+        ledger = ledger.replace_tickers(uploaded)
+        shares.update(uploaded.current_positions())
+        buy_price = {**buy_price, **uploaded.average_cost()}
+        buy_date_actual = {**buy_date_actual, **uploaded.first_dates()}
+    holdings_key = (bundle_key, ledger.fingerprint(), tuple(sorted(shares.items())))
+
+    def live_snapshot():
+        latest_price = dict(data_bundle["latest_price"])
+        quotes = live_prices([t for t in portfolio if t not in missing])
+        latest_price.update({t: q for t, q in quotes.items() if q is not None})
+        snapshot_key = (holdings_key, tuple(sorted(latest_price.items())))
+        if st.session_state.get("live_snapshot_key") == snapshot_key:
+            return st.session_state.live_snapshot
+
+        price_df = apply_live_bar(history_df, latest_price)
+        positions = position_history(ledger, price_df[valid_tickers])
+
+        live_date = price_df.index[-1]
+        state_key = (*holdings_key, live_date)
+        if st.session_state.get("metrics_state_key") != state_key:
+            wealth = positions["wealth"]
+            st.session_state.metrics_state = IncrementalPortfolioMetrics(wealth.loc[wealth.index < live_date])
+            st.session_state.metrics_state_key = state_key
+            st.session_state.indicators = {t: IndicatorState.from_history(price_dict[t].loc[price_dict[t].index < live_date]) for t in valid_tickers if t in price_dict}
+
+        indicators = st.session_state.indicators
+        for t, state in indicators.items():
+            close = price_df.at[live_date, t]
+            if pd.isna(close):
+                continue
+            bar = price_dict[t].loc[price_dict[t].index == live_date]
+            high = max(close, bar["High"].iloc[-1]) if not bar.empty else close
+            low = min(close, bar["Low"].iloc[-1]) if not bar.empty else close
+            state.tick(high, low, close)
+
+        live_value = float(positions["wealth"].iloc[-1]) if not positions["wealth"].empty else float("nan")
+        metrics = st.session_state.metrics_state.update(live_date, live_value, buy_price=buy_price, latest_price=latest_price, shares=shares, buy_date_actual=buy_date_actual)
+        pf_returns = metrics.get("returns", pd.Series(dtype=float))
+
+        graph_version = (state_key, tuple(price_df[valid_tickers].iloc[-1].tolist()), tuple(sorted(latest_price.items())))
+        if st.session_state.get("metric_graph") is None or st.session_state.metric_graph.version != graph_version:
+            st.session_state.metric_graph = MetricGraph(graph_version,
+                                                        price_df=price_df,
+                                                        valid_tickers=valid_tickers,
+                                                        market_df=market_df,
+                                                        latest_price=latest_price,
+                                                        shares=shares,
+                                                        pf_returns=pf_returns,
+                                                        position_history=positions,
+                                                        pf_log_returns=metrics.get("log_returns", pd.Series(dtype=float)))
+
+        st.session_state.live_snapshot = {"price_df": price_df,
+                                          "latest_price": latest_price,
+                                          "metrics": metrics,
+                                          "pf_returns": pf_returns,
+                                          "indicators": indicators,
+                                          "graph": st.session_state.metric_graph}
+        st.session_state.live_snapshot_key = snapshot_key
+        return st.session_state.live_snapshot
+
+    snapshot = live_snapshot()
+    price_df = snapshot["price_df"]
+    latest_price = snapshot["latest_price"]
+    metrics = snapshot["metrics"]
+    pf_returns = snapshot["pf_returns"]
+    indicators = snapshot["indicators"]
+    graph = snapshot["graph"]
+
+    from tabs.overview import overview
+    from tabs.risk import risk_analysis
+    from tabs.fundamentals import fundamental_insights
+    from tabs.dividends import dividend_income
+    from tabs.optimizer import portfolio_optimizer
+    from tabs.reports import report
+
+    scheduler = TabScheduler(graph.version)
+    scheduler.register("Overview", overview, price_df, shares, metrics, buy_price, latest_price, buy_date_actual, valid_tickers, date_ranges, price_dict, graph, indicators, live_snapshot)
+    scheduler.register("Risk Analysis", risk_analysis, metrics, price_df, valid_tickers, pf_returns, graph, live_snapshot)
+    scheduler.register("Fundamentals Insight", fundamental_insights, valid_tickers, latest_price)
+    scheduler.register("Dividends & Income", dividend_income, valid_tickers, div_dict, date_ranges, buy_price, latest_price, shares, graph)
+    scheduler.register("Optimizer", portfolio_optimizer, valid_tickers, graph)
+    scheduler.register("Report", report, lambda: tuple(scheduler.output(name) for name in ["Overview", "Risk Analysis", "Fundamentals Insight", "Dividends & Income"]), pf_returns, metrics, holdings_key)
+
+    tab_names = list(scheduler.tasks)
+    active_tab = st.segmented_control("Section", options=list(range(len(tab_names))), format_func=lambda i: tab_names[i], key="active_tab", label_visibility="collapsed")
+    scheduler.render(tab_names[active_tab if active_tab is not None else 0])
@@ -1,25 +1,29 @@
 import streamlit as st
 import pandas as pd
-from utils.data_fetch import fetch_fundamentals
-from utils.helper import get_first_available, available_series, metric_row, safe_float, safe_divide, safe_round, safe_margin, cagr, safe_subtract, safe_multiple
+from utils.data_fetch import fetch_fundamentals, fetch_many
+from utils.helper import get_first_available, available_series, metric_row, safe_divide, safe_round, safe_margin, cagr, safe_subtract, safe_multiple
 from utils.charts import line_chart, pie_chart, bubble_chart
 from utils.ui import interpretation_box
 
 
-def dividend_income(valid_tickers, div_dict, date_ranges, buy_price, latest_price, shares):
+def dividend_income(valid_tickers, div_dict, date_ranges, buy_price, latest_price, shares, graph):
         st.markdown("<h2 style='text-align:center; color:#7161ef;'>Dividend & Income Analysis</h2>", unsafe_allow_html=True)
         st.markdown("<hr style='opacity:0.2;'>", unsafe_allow_html=True)
 
         div_rows = []
         max_cagr_yr = 0
-        share_values = {t: safe_float(latest_price.get(t)) * float(shares.get(t, 0)) for t in valid_tickers}
-        total_value = float(sum(share_values.values())) if share_values else 0.0
+        share_values = graph["share_values"]
+        total_value = graph["total_value"]
         pf_income = 0
         total_projected_annual_income = 0
         dividend_payers = 0
         
+        statements, timed_out = fetch_many(fetch_fundamentals, valid_tickers, default={})
+        if timed_out:
+            st.info(f"Fundamentals unavailable for: {', '.join(timed_out)}. Showing the remaining holdings.")
+
         for t in valid_tickers:
-            fs = fetch_fundamentals(t)
+            fs = statements[t]
             income = fs.get("income")
             shares_outstanding = fs.get("s_o")
             divs = div_dict.get(t) 
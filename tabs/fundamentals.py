@@ -1,10 +1,11 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from utils.data_fetch import fetch_fundamentals
+from utils.data_fetch import fetch_fundamentals, fetch_many
 from utils.helper import get_first_available, available_series, yoy_growth, cagr, safe_divide, safe_round, safe_subtract, metric_row, format_market_cap, safe_margin
 from utils.charts import bubble_chart, box_chart, bar_chart
 from utils.ui import interpretation_box
+from utils.scheduler import persist
 
 
 def fundamental_insights(valid_tickers, latest_price):
@@ -18,8 +19,12 @@ def fundamental_insights(valid_tickers, latest_price):
         summary = {}
 
 
+        statements, timed_out = fetch_many(fetch_fundamentals, valid_tickers, default={})
+        if timed_out:
+            st.info(f"Fundamentals unavailable for: {', '.join(timed_out)}. Showing the remaining holdings.")
+
         for t in valid_tickers:
-            fs = fetch_fundamentals(t)
+            fs = statements[t]
             if not fs:
                 continue
              
@@ -350,7 +355,7 @@ def fundamental_insights(valid_tickers, latest_price):
         st.markdown("<h3 style='color:#7161ef;'>DuPont Analysis</h3>", unsafe_allow_html=True)
         dupont_df = pd.DataFrame(du_pont)
         dupont_df = dupont_df.sort_values("Year").reset_index(drop=True)
-        view_mode = st.segmented_control("Select stock", options=valid_tickers, selection_mode="single", default=valid_tickers[0], label_visibility="collapsed", key="view_mode")
+        view_mode = st.segmented_control("Select stock", options=valid_tickers, selection_mode="single", default=valid_tickers[0], label_visibility="collapsed", key=persist("view_mode", valid_tickers))
         if view_mode:
             dupont_view = dupont_df[dupont_df["Symbol"] == view_mode]
         else:
@@ -427,7 +432,7 @@ def fundamental_insights(valid_tickers, latest_price):
             st.plotly_chart(fig, width="stretch")
         st.markdown("<hr style='opacity:0.2;'>", unsafe_allow_html=True)                    
   
-        view_mode_summary = st.segmented_control("Select stock for summary", options=valid_tickers, selection_mode="single", default=valid_tickers[0], label_visibility="collapsed", key="view_mode_summary")
+        view_mode_summary = st.segmented_control("Select stock for summary", options=valid_tickers, selection_mode="single", default=valid_tickers[0], label_visibility="collapsed", key=persist("view_mode_summary", valid_tickers))
         summary = summary.get(view_mode_summary, [])
             
         interpretation_box(f"Fundamental Strength Summary - {view_mode_summary}", summary)
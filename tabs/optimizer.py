@@ -0,0 +1,40 @@
+import streamlit as st
+from utils.optimizer import optimize_portfolio
+from utils.charts import frontier_chart
+from utils.ui import interpretation_box
+from utils.scheduler import persist
+
+
+def portfolio_optimizer(valid_tickers, graph):
+        st.markdown("<h2 style='text-align:center; color:#7161ef;'>Portfolio Optimization</h2>", unsafe_allow_html=True)
+        st.markdown("<hr style='opacity:0.2;'>", unsafe_allow_html=True)
+
+        if len(valid_tickers) < 2:
+            st.info("Add at least two holdings with price history to run the optimizer.")
+            return
+
+        min_cap = min(100, int(100 / len(valid_tickers)) + 1)
+        cap = st.slider("Maximum Weight per Position (%)", min_value=min_cap, max_value=100, value=100, step=1, key=persist("optimizer_cap", range(min_cap, 101)))
+        result = graph.memo(("optimizer", cap), optimize_portfolio, graph["log_returns"], graph["covariance"], graph["weights"], cap=cap / 100)
+        frontier, portfolios, weights = result["frontier"], result["portfolios"], result["weights"]
+        if frontier.empty:
+            st.info("Not enough overlapping history to estimate the covariance matrix.")
+            return
+
+        st.markdown("<h3 style='color:#7161ef;'>Efficient Frontier</h3>", unsafe_allow_html=True)
+        st.plotly_chart(frontier_chart(frontier, portfolios), width="stretch")
+        st.markdown("<hr style='opacity:0.2;'>", unsafe_allow_html=True)
+
+        st.markdown("<h3 style='color:#7161ef;'>Optimized Portfolios</h3>", unsafe_allow_html=True)
+        st.dataframe(portfolios.style.format({"Return": "{:.2%}", "Volatility": "{:.2%}", "Sharpe": "{:.2f}"}), hide_index=True, width="stretch")
+        st.dataframe((weights * 100).style.format("{:.2f}%"), width="stretch")
+        st.markdown("<hr style='opacity:0.2;'>", unsafe_allow_html=True)
+
+        current = portfolios.set_index("Portfolio").loc["Current"]
+        best = portfolios.set_index("Portfolio").loc["Max Sharpe"]
+        min_var = portfolios.set_index("Portfolio").loc["Min Variance"]
+        shift = (weights["Max Sharpe"] - weights["Current"]).sort_values()
+        summary = [f"The current allocation carries {current['Volatility']:.2%} annualized volatility for a {current['Return']:.2%} expected return (Sharpe {current['Sharpe']:.2f}).",
+                   f"The maximum-Sharpe allocation targets {best['Return']:.2%} at {best['Volatility']:.2%} volatility (Sharpe {best['Sharpe']:.2f}), mainly by adding to {shift.index[-1]} and trimming {shift.index[0]}.",
+                   f"The minimum-variance allocation would lower volatility to {min_var['Volatility']:.2%}. Estimates rely on historical returns and covariances, which may not persist."]
+        interpretation_box("Optimization Summary", summary)
@@ -1,74 +1,30 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from utils.data_fetch import fetch_sector_industry
-from utils.analytics import compute_position_health, portfolio_unrealized_pnl
+from utils.data_fetch import fetch_sector_industry, fetch_many
+from utils.analytics import compute_position_health
 from utils.helper import metric_row, safe_float
 from utils.charts import pie_chart, bar_chart, line_chart
+from utils.scheduler import live_fragment, persist
 from utils.ui import color_rsi_category, color_gain_loss, color_trend_class, interpretation_box 
 
 
-def overview(price_df, shares, metrics, buy_price, latest_price, buy_date_actual, valid_tickers, date_ranges, price_dict):
+def overview(price_df, shares, metrics, buy_price, latest_price, buy_date_actual, valid_tickers, date_ranges, price_dict, graph, indicators=None, live=None):
         st.markdown("<h2 style='text-align:center; color:#7161ef;'>Portfolio Summary Overview</h2>", unsafe_allow_html=True)
         st.markdown("<hr style='opacity:0.2;'>", unsafe_allow_html=True)
 
-        share_values = {t: safe_float(latest_price.get(t)) * float(shares.get(t, 0)) for t in valid_tickers}
-        total_value = float(sum(share_values.values())) if share_values else 0.0
-        weights = {t: (share_values[t] / total_value if total_value > 0 else 0.0) for t in valid_tickers}
-
-        gain_pct = {}
-        gain_val = {}
-        sectors = []
-        industries = []
-        for t in valid_tickers:
-            bp = buy_price.get(t)
-            lp = latest_price.get(t)
-            sh = shares.get(t, 0)
-            gain_pct[t] = ((lp - bp) / bp) if (bp and lp) else np.nan
-            gain_val[t] = (lp-bp) * sh if (bp and lp and sh) else np.nan
-            info = fetch_sector_industry(t)
-            sectors.append(info.get("Sector"))
-            industries.append(info.get("Industry"))
-
-        best_stock = max(gain_pct, key=lambda k: gain_pct.get(k, -np.inf)) if gain_pct else None
-        worst_stock = min(gain_pct, key=lambda k: gain_pct.get(k, np.inf)) if gain_pct else None 
-        sectors = [s if s not in (None, "", np.nan) else "Unknown" for s in sectors]
-        industries = [i if i not in (None, "", np.nan) else "Unknown" for i in industries]
-
-        metric_row([("Top Performer", best_stock or "–", f"{gain_pct.get(best_stock, 0):.2%}" if best_stock else None),
-                    ("Portfolio Value", f"₹{total_value:,.2f}", None),
-                    ("Portfolio Gain", f"₹{metrics['pf_gain_loss']:,.2f}", None),
-                    ("Cumulative Return", f"{metrics['cumulative_return']:.2%}", None),
-                    ("Portfolio CAGR", f"{metrics['cagr']:.2%}", None),
-                    ("Worst Performer", worst_stock or "–", f"{gain_pct.get(worst_stock, 0):.2%}" if worst_stock else None),])
-        
+        live = live or (lambda: {"metrics": metrics, "latest_price": latest_price, "graph": graph})
+        live_tiles(live, shares, buy_price, valid_tickers)
         st.markdown("<hr style='opacity:0.2;'>", unsafe_allow_html=True)
 
-        pf_summary_table = pd.DataFrame({"Ticker": valid_tickers,
-                                         "Sector": sectors,
-                                         "Industry": industries,
-                                         "Shares": [shares[t] for t in valid_tickers],
-                                         "Buy Date": [pd.to_datetime(date_ranges[t][0]).date() for t in valid_tickers],
-                                         "Buy Price (₹)": [safe_float(buy_price.get(t)) for t in valid_tickers],
-                                         "Latest Price (₹)": [safe_float(latest_price.get(t)) for t in valid_tickers],
-                                         "Gain/Loss %": [gain_pct.get(t) for t in valid_tickers],
-                                         "Gain/Loss (₹)": [gain_val.get(t) for t in valid_tickers],
-                                         "Share Value (₹)": [share_values.get(t) for t in valid_tickers],
-                                         "Weights %": [weights.get(t, 0) * 100 for t in valid_tickers]}).sort_values("Share Value (₹)", ascending=False).reset_index(drop=True)
-        pf_summary_table.index += 1
-        pf_summary_table.index.name = 'Sl. No.'
+        profiles, _ = fetch_many(fetch_sector_industry, valid_tickers, default={"Sector": "Unknown", "Industry": "Unknown"})
+        holdings = live_holdings(live, shares, buy_price, valid_tickers, date_ranges, profiles)
+        pf_summary_table, gain_pct, best_stock = holdings["table"], holdings["gain_pct"], holdings["best_stock"]
+        share_values, total_value, weights, metrics = holdings["share_values"], holdings["total_value"], holdings["weights"], holdings["metrics"]
 
-        st.markdown("<h3 style='color:#7161ef;'>Holdings Breakdown</h3>", unsafe_allow_html=True)
-        st.dataframe(pf_summary_table.style.format({'Buy Price (₹)': '₹{:,.2f}',
-                                                    'Latest Price (₹)': '₹{:,.2f}',
-                                                    'Gain/Loss %': '{:.2%}',
-                                                    'Gain/Loss (₹)': '₹{:,.2f}',
-                                                    'Share Value (₹)': '₹{:,.2f}',
-                                                    'Weights %': '{:.2f}%'}).map(color_gain_loss, subset=["Gain/Loss %", "Gain/Loss (₹)"]), width="stretch")
-        
         st.markdown("<hr style='opacity:0.2;'>", unsafe_allow_html=True)
 
-        health_df = compute_position_health(price_dict)
+        health_df = compute_position_health(price_dict, indicators)
         gains_df = pd.DataFrame({"Ticker": list(gain_pct.keys())})
 
         if not health_df.empty:
@@ -115,46 +71,7 @@ def overview(price_df, shares, metrics, buy_price, latest_price, buy_date_actual
         st.plotly_chart(fig, width="stretch")
         st.markdown("<hr style='opacity:0.2;'>", unsafe_allow_html=True)
         
-        st.markdown("<h3 style='color:#7161ef;'>Unrealized P/L Trend</h3>", unsafe_allow_html=True)
-        try:
-            view_mode = st.segmented_control("Unrealized P/L View", ["Portfolio-Level", "Individual Stock"], default="Portfolio-Level")
-            pnl_df = portfolio_unrealized_pnl(price_df[valid_tickers] if not price_df.empty else pd.DataFrame(), shares, buy_price, buy_date_actual)
-            if view_mode == "Portfolio-Level":
-                if not pnl_df.empty:
-                    pnl_df = pnl_df.dropna()
-                    if not pnl_df.empty:
-                        pnl_df_reset = pnl_df.reset_index().rename(columns={"index": "Date"})
-                        fig_pnl = line_chart(pnl_df_reset, x="Date", y="Unrealized_PnL", title=None, labels={"Unrealized_PnL": "Unrealized P/L (₹)"})
-                        st.plotly_chart(fig_pnl, width="stretch")
-                    else:
-                        st.info("Not enough data to compute Unrealized P/L.")
-                else:
-                    st.info("Unrealized P/L data not available.")
-        
-            elif view_mode == "Individual Stock":
-                per_stock_lines = pd.DataFrame(index=price_df.index)
-
-                for t in valid_tickers:
-                    s = shares.get(t, 0)
-                    bp = safe_float(buy_price.get(t))
-                    if s and bp is not None and t in price_df.columns:
-                        start_dt = buy_date_actual.get(t)
-                        per_share = price_df[t].loc[price_df.index >= start_dt].astype(float) - bp
-                        per_stock_lines[t] = per_share * s
-
-                if not per_stock_lines.empty:
-                    per_stock_reset = per_stock_lines.reset_index().rename(columns={"index": "Date"})
-                    fig_stock_lines = line_chart(per_stock_reset,
-                                                 x="Date",
-                                                 y=list(per_stock_lines.columns),
-                                                 title=None)
-                    fig_stock_lines.update_yaxes(title_text="Unrealized P/L (₹)")
-                    st.plotly_chart(fig_stock_lines, width="stretch")
-                else:
-                    st.info("Not enough data to compute per-stock P/L trend.")
-        
-        except Exception as e:
-            st.warning(f"Unrealized P/L error: {e}")
+        live_pnl(live)
         st.markdown("<hr style='opacity:0.2;'>", unsafe_allow_html=True)
 
         st.markdown("<h3 style='color:#7161ef;'>Historical Price Trend</h3>", unsafe_allow_html=True)
@@ -165,7 +82,7 @@ def overview(price_df, shares, metrics, buy_price, latest_price, buy_date_actual
             combined.append(df_temp)
         if combined:
             hist_df = pd.concat(combined, ignore_index=True)
-            view_mode = st.segmented_control("Performance View", ["Price Trend", "Indexed Performance (Base 100)"], default="Price Trend")
+            view_mode = st.segmented_control("Performance View", ["Price Trend", "Indexed Performance (Base 100)"], default="Price Trend", key=persist("performance_view"))
             hist_df["Indexed"] = hist_df["Close Price (₹)"] / hist_df.groupby("Ticker")["Close Price (₹)"].transform("first") * 100
             df_hist = hist_df.copy()
             if view_mode == "Price Trend":
@@ -249,4 +166,110 @@ def overview(price_df, shares, metrics, buy_price, latest_price, buy_date_actual
         interpretation_box("Portfolio Overview Summary", summary)
 
         overview_df = pf_summary_table.merge(display_df, on="Ticker", how="inner")
-        return overview_df
\ No newline at end of file
+        return overview_df
+
+
+def holding_gains(latest_price, buy_price, shares, valid_tickers):
+        gain_pct = {}
+        gain_val = {}
+        for t in valid_tickers:
+            bp = buy_price.get(t)
+            lp = latest_price.get(t)
+            sh = shares.get(t, 0)
+            gain_pct[t] = ((lp - bp) / bp) if (bp and lp) else np.nan
+            gain_val[t] = (lp-bp) * sh if (bp and lp and sh) else np.nan
+        best_stock = max(gain_pct, key=lambda k: gain_pct.get(k, -np.inf)) if gain_pct else None
+        worst_stock = min(gain_pct, key=lambda k: gain_pct.get(k, np.inf)) if gain_pct else None
+        return gain_pct, gain_val, best_stock, worst_stock
+
+
+@live_fragment
+def live_tiles(live, shares, buy_price, valid_tickers):
+        snapshot = live()
+        metrics, graph = snapshot["metrics"], snapshot["graph"]
+        gain_pct, _, best_stock, worst_stock = holding_gains(snapshot["latest_price"], buy_price, shares, valid_tickers)
+
+        metric_row([("Top Performer", best_stock or "–", f"{gain_pct.get(best_stock, 0):.2%}" if best_stock else None),
+                    ("Portfolio Value", f"₹{graph['total_value']:,.2f}", None),
+                    ("Portfolio Gain", f"₹{metrics['pf_gain_loss']:,.2f}", None),
+                    ("Cumulative Return", f"{metrics['cumulative_return']:.2%}", None),
+                    ("Portfolio CAGR", f"{metrics['cagr']:.2%}", None),
+                    ("Worst Performer", worst_stock or "–", f"{gain_pct.get(worst_stock, 0):.2%}" if worst_stock else None),])
+
+
+@live_fragment
+def live_holdings(live, shares, buy_price, valid_tickers, date_ranges, profiles):
+        snapshot = live()
+        metrics, latest_price, graph = snapshot["metrics"], snapshot["latest_price"], snapshot["graph"]
+        share_values = graph["share_values"]
+        total_value = graph["total_value"]
+        weights = graph["weights"]
+        gain_pct, gain_val, best_stock, _ = holding_gains(latest_price, buy_price, shares, valid_tickers)
+
+        sectors = [profiles[t].get("Sector") for t in valid_tickers]
+        industries = [profiles[t].get("Industry") for t in valid_tickers]
+        sectors = [s if s not in (None, "", np.nan) else "Unknown" for s in sectors]
+        industries = [i if i not in (None, "", np.nan) else "Unknown" for i in industries]
+
+        pf_summary_table = pd.DataFrame({"Ticker": valid_tickers,
+                                         "Sector": sectors,
+                                         "Industry": industries,
+                                         "Shares": [shares[t] for t in valid_tickers],
+                                         "Buy Date": [pd.to_datetime(date_ranges[t][0]).date() for t in valid_tickers],
+                                         "Buy Price (₹)": [safe_float(buy_price.get(t)) for t in valid_tickers],
+                                         "Latest Price (₹)": [safe_float(latest_price.get(t)) for t in valid_tickers],
+                                         "Gain/Loss %": [gain_pct.get(t) for t in valid_tickers],
+                                         "Gain/Loss (₹)": [gain_val.get(t) for t in valid_tickers],
+                                         "Share Value (₹)": [share_values.get(t) for t in valid_tickers],
+                                         "Weights %": [weights.get(t, 0) * 100 for t in valid_tickers]}).sort_values("Share Value (₹)", ascending=False).reset_index(drop=True)
+        pf_summary_table.index += 1
+        pf_summary_table.index.name = 'Sl. No.'
+
+        st.markdown("<h3 style='color:#7161ef;'>Holdings Breakdown</h3>", unsafe_allow_html=True)
+        st.dataframe(pf_summary_table.style.format({'Buy Price (₹)': '₹{:,.2f}',
+                                                    'Latest Price (₹)': '₹{:,.2f}',
+                                                    'Gain/Loss %': '{:.2%}',
+                                                    'Gain/Loss (₹)': '₹{:,.2f}',
+                                                    'Share Value (₹)': '₹{:,.2f}',
+                                                    'Weights %': '{:.2f}%'}).map(color_gain_loss, subset=["Gain/Loss %", "Gain/Loss (₹)"]), width="stretch")
+        return {"table": pf_summary_table, "gain_pct": gain_pct, "best_stock": best_stock, "metrics": metrics,
+                "share_values": share_values, "total_value": total_value, "weights": weights}
+
+
+@live_fragment
+def live_pnl(live):
+        st.markdown("<h3 style='color:#7161ef;'>Unrealized P/L Trend</h3>", unsafe_allow_html=True)
+        try:
+            view_mode = st.segmented_control("Unrealized P/L View", ["Portfolio-Level", "Individual Stock"], default="Portfolio-Level", key=persist("pnl_view"))
+            history = live()["graph"]["position_history"]
+            held = history["positions"].ne(0)
+            if view_mode == "Portfolio-Level":
+                pnl_df = history["pnl"].loc[held.any(axis=1)].to_frame("Unrealized_PnL")
+                if not pnl_df.empty:
+                    pnl_df = pnl_df.dropna()
+                    if not pnl_df.empty:
+                        pnl_df_reset = pnl_df.reset_index().rename(columns={"index": "Date"})
+                        fig_pnl = line_chart(pnl_df_reset, x="Date", y="Unrealized_PnL", title=None, labels={"Unrealized_PnL": "Unrealized P/L (₹)"})
+                        st.plotly_chart(fig_pnl, width="stretch")
+                    else:
+                        st.info("Not enough data to compute Unrealized P/L.")
+                else:
+                    st.info("Unrealized P/L data not available.")
+        
+            elif view_mode == "Individual Stock":
+                opened = held.cummax()
+                per_stock_lines = history["holding_pnl"].where(opened).dropna(axis=1, how="all")
+
+                if not per_stock_lines.empty:
+                    per_stock_reset = per_stock_lines.reset_index().rename(columns={"index": "Date"})
+                    fig_stock_lines = line_chart(per_stock_reset,
+                                                 x="Date",
+                                                 y=list(per_stock_lines.columns),
+                                                 title=None)
+                    fig_stock_lines.update_yaxes(title_text="Unrealized P/L (₹)")
+                    st.plotly_chart(fig_stock_lines, width="stretch")
+                else:
+                    st.info("Not enough data to compute per-stock P/L trend.")
+        
+        except Exception as e:
+            st.warning(f"Unrealized P/L error: {e}")
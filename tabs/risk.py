@@ -1,24 +1,27 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from utils.analytics import compute_stock_risk_metrics, compute_rolling_metrics
 from utils.helper import metric_row
-from utils.charts import area_chart, scatter_plot, heatmap_chart, dual_axis_line_chart
-from utils.ui import beta_color, interpretation_box
+from utils.scheduler import live_fragment, persist
+from utils.simulation import monte_carlo_var, HORIZONS
+from utils.figure_cache import fingerprint
+from utils.stress import worst_drawdown_windows, stress_test
+from utils.charts import area_chart, scatter_plot, heatmap_chart, dual_axis_line_chart, line_chart, bar_chart
+from utils.ui import beta_color, color_gain_loss, interpretation_box
 
+MC_SEED = 42
+MC_RUNS_KEPT = 8
 
-def risk_analysis(metrics, price_df, valid_tickers, pf_returns, overview_df):
+
+def risk_analysis(metrics, price_df, valid_tickers, pf_returns, graph, live=None):
         st.markdown("<h2 style='text-align:center; color:#7161ef;'>Risk & Volatility Analytics</h2>", unsafe_allow_html=True)
         st.markdown("<hr style='opacity:0.2;'>", unsafe_allow_html=True)
         
-        metric_row([("Annualized Volatility", f"{metrics['volatility']:.2%}", None),
-                    ("Sharpe Ratio", f"{metrics['sharpe']:.2f}", None),
-                    ("Sortino Ratio", f"{metrics['sortino']:.2f}", None),
-                    ("Max Drawdown", f"{abs(metrics['max_dd']):.2%}", None)])
+        live_risk_tiles(live or (lambda: {"metrics": metrics}))
         
         st.markdown("<hr style='opacity:0.2;'>", unsafe_allow_html=True)
 
-        risk_df = compute_stock_risk_metrics(price_df[valid_tickers], market_df = st.session_state.loaded_data["market_df"])
+        risk_df = graph["stock_risk"]
 
         st.markdown("<h3 style='color:#7161ef;'>Stock-Level Risk Metrics</h3>", unsafe_allow_html=True)
         if not risk_df.empty:
@@ -34,7 +37,7 @@ def risk_analysis(metrics, price_df, valid_tickers, pf_returns, overview_df):
 
         st.markdown("<h3 style='color:#7161ef;'>Drawdown History (From Peak)</h3>", unsafe_allow_html=True)
         if not pf_returns.empty:
-            dd = pf_returns.to_drawdown_series()
+            dd = graph["drawdown"]
             fig_dd = area_chart(dd.index, dd.values, title=None)
             st.plotly_chart(fig_dd, width="stretch")
         else:
@@ -45,7 +48,7 @@ def risk_analysis(metrics, price_df, valid_tickers, pf_returns, overview_df):
         if not risk_df.empty:
             rr_df = pd.DataFrame({"Ticker": risk_df["Ticker"],
                                   "Risk (Annualized Volatility)": risk_df["Volatility (Annualized)"],
-                                  "Return (Annualized)": [ser.mean() * 252 for ser in risk_df["Returns"]]})
+                                  "Return (Annualized)": risk_df["Return (Annualized)"]})
             
             fig_rr = scatter_plot(df=rr_df,
                                   x="Risk (Annualized Volatility)",
@@ -62,17 +65,23 @@ def risk_analysis(metrics, price_df, valid_tickers, pf_returns, overview_df):
         
         st.markdown("<h3 style='color:#7161ef;'>Correlation Matrix</h3>", unsafe_allow_html=True)
         if not price_df.empty:
-            corr = np.log(price_df[valid_tickers] / price_df[valid_tickers].shift(1)).dropna().corr()
+            order = graph["correlation_order"]
+            corr = graph["correlation"].loc[order, order]
             fig_corr = heatmap_chart(corr, title="")
             st.plotly_chart(fig_corr, width="stretch")
+            pairs = graph["correlation_pairs"]
+            if len(valid_tickers) > 2 and not pairs.empty:
+                st.markdown("<h3 style='color:#7161ef;'>Most Correlated Pairs</h3>", unsafe_allow_html=True)
+                st.dataframe(pairs.style.format({"Correlation": "{:.2f}"}), hide_index=True, width="stretch")
         else:
             st.info("Correlation heatmap cannot be created (no price data).")
 
         st.markdown("<h3 style='color:#7161ef;'>Rolling Volatility & Sharpe Ratio</h3>", unsafe_allow_html=True)
-        rolling_vol, rolling_sharpe = compute_rolling_metrics(metrics["log_returns"], window=60)
-        df_roll = pd.DataFrame({"Date": metrics["log_returns"].index,
-                                "Rolling Vol": rolling_vol,
-                                "Rolling Sharpe": rolling_sharpe})
+        window_label = st.segmented_control("Rolling Window", ["20D", "60D", "120D", "252D"], default="60D", key=persist("rolling_window")) or "60D"
+        rolling = graph["rolling"][int(window_label[:-1])]
+        df_roll = pd.DataFrame({"Date": rolling["volatility"].index,
+                                "Rolling Vol": rolling["volatility"]["Portfolio"].values,
+                                "Rolling Sharpe": rolling["sharpe"]["Portfolio"].values})
 
         fig_rolling = dual_axis_line_chart(df_roll,
                                            x="Date",
@@ -82,6 +91,75 @@ def risk_analysis(metrics, price_df, valid_tickers, pf_returns, overview_df):
                                            y2_name="Rolling Sharpe Ratio",
                                            title="")
         st.plotly_chart(fig_rolling, width="stretch")
+
+        st.markdown(f"<h3 style='color:#7161ef;'>Rolling {window_label} Metrics by Holding</h3>", unsafe_allow_html=True)
+        rolling_options = {"Volatility": "volatility", "Sharpe Ratio": "sharpe", "Sortino Ratio": "sortino", "Beta vs NIFTY 50": "beta", "Correlation vs NIFTY 50": "correlation"}
+        rolling_metric_options = [k for k, v in rolling_options.items() if v in rolling]
+        rolling_metric = st.selectbox("Rolling Metric", rolling_metric_options, key=persist("rolling_metric", rolling_metric_options))
+        rolling_df = rolling[rolling_options[rolling_metric]].dropna(how="all")
+        if not rolling_df.empty:
+            rolling_reset = rolling_df.reset_index(names="Date")
+            fig_rolling_stk = line_chart(rolling_reset, x="Date", y=list(rolling_df.columns), title=None)
+            fig_rolling_stk.update_yaxes(title_text=rolling_metric)
+            st.plotly_chart(fig_rolling_stk, width="stretch")
+        else:
+            st.info(f"Not enough history for a {window_label} rolling window.")
+        st.markdown("<hr style='opacity:0.2;'>", unsafe_allow_html=True)
+
+        st.markdown("<h3 style='color:#7161ef;'>Monte Carlo VaR & CVaR</h3>", unsafe_allow_html=True)
+        mc_method = st.segmented_control("Simulation Method", ["Gaussian", "Block Bootstrap"], default="Gaussian", key=persist("mc_method")) or "Gaussian"
+        mc_paths = st.select_slider("Simulated Paths", options=[10_000, 25_000, 50_000, 100_000], value=50_000, key=persist("mc_paths"))
+        exposure = pd.Series(graph["share_values"], dtype=float)
+        total_value = float(exposure.sum())
+        mc_weights = tuple((exposure / total_value).round(4).items()) if total_value else ()
+        mc_key = (mc_method, mc_paths, MC_SEED, HORIZONS, mc_weights, fingerprint(graph["log_returns"].iloc[:-1]))
+        mc_runs = st.session_state.setdefault("monte_carlo_runs", {})
+        if st.button("🎲 Run Simulation"):
+            with st.spinner("Simulating portfolio paths..."):
+                mc_runs[mc_key] = {"value": total_value,
+                                   "result": monte_carlo_var(graph["log_returns"], graph["shares"], graph["latest_price"],
+                                                             horizons=HORIZONS, n_paths=mc_paths, method="gaussian" if mc_method == "Gaussian" else "bootstrap", seed=MC_SEED)}
+                while len(mc_runs) > MC_RUNS_KEPT:
+                    mc_runs.pop(next(iter(mc_runs)))
+        if mc_key in mc_runs:
+            mc_run = mc_runs[mc_key]
+            mc_summary = mc_run["result"]["summary"].copy()
+            scale = total_value / mc_run["value"] if mc_run["value"] else 1.0
+            for col in [c for c in mc_summary.columns if c.endswith("(₹)")]:
+                mc_summary[col] *= scale
+            if not mc_summary.empty:
+                st.dataframe(mc_summary.style.format({"Expected P/L (₹)": "₹{:,.0f}",
+                                                      "VaR 95% (₹)": "₹{:,.0f}",
+                                                      "CVaR 95% (₹)": "₹{:,.0f}",
+                                                      "VaR 95%": "{:.2%}",
+                                                      "CVaR 95%": "{:.2%}"}), hide_index=True, width="stretch")
+            else:
+                st.info("Not enough overlapping history to simulate the portfolio.")
+        else:
+            st.info("Run the simulation to estimate forward-looking VaR and CVaR (expected shortfall) across horizons.")
+        st.markdown("<hr style='opacity:0.2;'>", unsafe_allow_html=True)
+
+        st.markdown("<h3 style='color:#7161ef;'>Historical Stress Scenarios</h3>", unsafe_allow_html=True)
+        market_close = graph["market_df"]["Close"] if not graph["market_df"].empty else pd.Series(dtype=float)
+        n_worst = st.slider("Worst NIFTY 50 Drawdowns", min_value=1, max_value=10, value=5, key=persist("stress_worst"))
+        shock_mode = st.segmented_control("Shock Model", ["Realised", "Beta-Scaled"], default="Realised", key=persist("shock_model")) or "Realised"
+        custom_window = st.date_input("Custom Scenario Window", value=(), key=persist("stress_window"))
+        scenarios = worst_drawdown_windows(market_close, n_worst)
+        if len(custom_window) == 2:
+            scenarios.append(("Custom Window", pd.Timestamp(custom_window[0]), pd.Timestamp(custom_window[1])))
+        betas = risk_df.set_index("Ticker")["Beta"] if not risk_df.empty else pd.Series(dtype=float)
+        stress = graph.memo(("stress", n_worst, shock_mode, tuple(custom_window)), stress_test, graph["prices"], market_close, pd.Series(graph["share_values"]), betas,
+                            scenarios, mode="beta" if shock_mode == "Beta-Scaled" else "realised")
+        stress_df = stress["summary"]
+        if not stress_df.empty:
+            st.dataframe(stress_df.style.format({"NIFTY 50 Move": "{:.2%}",
+                                                 "Portfolio P/L (₹)": "₹{:,.0f}",
+                                                 "Portfolio P/L %": "{:.2%}"}).map(color_gain_loss, subset=["Portfolio P/L (₹)", "Portfolio P/L %"]), hide_index=True, width="stretch")
+            stress_plot = stress_df.assign(**{"P/L %": stress_df["Portfolio P/L %"] * 100}).dropna(subset=["P/L %"])
+            fig_stress = bar_chart(stress_plot, x="Scenario", y="P/L %", show_text=True, title=None)
+            st.plotly_chart(fig_stress, width="stretch")
+        else:
+            st.info("Not enough market history to build stress scenarios.")
         st.markdown("<hr style='opacity:0.2;'>", unsafe_allow_html=True)
 
         if metrics['sharpe'] is not None:
@@ -116,7 +194,7 @@ def risk_analysis(metrics, price_df, valid_tickers, pf_returns, overview_df):
             vol_performance = "unknown"
         
         stk_beta = risk_df[["Ticker", "Beta"]].dropna()
-        stk_weights = overview_df[["Ticker", "Weights %"]].dropna()
+        stk_weights = pd.DataFrame({"Ticker": list(graph["weights"]), "Weights %": [w * 100 for w in graph["weights"].values()]})
         beta_df = stk_beta.merge(stk_weights, on="Ticker", how="inner")
         beta_df["weight"] = beta_df["Weights %"] / 100
         pf_beta = (beta_df["weight"] * beta_df["Beta"]).sum()
@@ -154,8 +232,7 @@ def risk_analysis(metrics, price_df, valid_tickers, pf_returns, overview_df):
         if not rank_df.empty:
             tail_stk = rank_df.loc[rank_df["CVaR 95%"].idxmax()]
             tail_ticker = tail_stk["Ticker"]
-            tail_value_row = overview_df.loc[overview_df["Ticker"] == tail_ticker, "Share Value (₹)"]
-            tail_value = tail_value_row.iloc[0]
+            tail_value = graph["share_values"][tail_ticker]
             tail_var = tail_stk["VaR 95%"]
             tail_cvar = tail_stk["CVaR 95%"]
             var_value = tail_var * tail_value 
@@ -186,5 +263,14 @@ def risk_analysis(metrics, price_df, valid_tickers, pf_returns, overview_df):
                    f"Combined Sharpe and Sortino ratios suggest that portfolio's risk-taking has been {s_s_performance}, resulting in a {'balanced' if sharpe_performance == 'efficient' and sortino_performance == 'strong' else 'cautious'} overall risk profile."]
                        
         interpretation_box("Risk Summary", summary)
-        risk_analysis_df = risk_df.drop(columns=["Returns"], errors="ignore")
+        risk_analysis_df = risk_df.drop(columns=["Return (Annualized)"], errors="ignore")
         return risk_analysis_df
+
+
+@live_fragment
+def live_risk_tiles(live):
+        metrics = live()["metrics"]
+        metric_row([("Annualized Volatility", f"{metrics['volatility']:.2%}", None),
+                    ("Sharpe Ratio", f"{metrics['sharpe']:.2f}", None),
+                    ("Sortino Ratio", f"{metrics['sortino']:.2f}", None),
+                    ("Max Drawdown", f"{abs(metrics['max_dd']):.2%}", None)])
@@ -1,19 +1,14 @@
+import warnings
 import numpy as np
 import pandas as pd
+from scipy.signal import lfilter
 import quantstats as qs
-from utils.helper import safe_float, safe_divide, safe_multiple, safe_round, safe_subtract, safe_margin
+from utils.indicators import IndicatorState
+from utils.helper import safe_divide, safe_multiple, safe_round, safe_subtract, safe_margin
 
-qs.extend_pandas()
-
-def portfolio_value_from_prices(price_df: pd.DataFrame, shares: dict) -> pd.Series:
-    if price_df.empty:
-        return pd.Series(dtype=float)
-    shares_series = pd.Series(shares)
-    aligned = price_df.loc[:, price_df.columns.intersection(shares_series.index)].copy()
-    value_df = aligned.multiply(shares_series, axis=1)
-    pf = value_df.sum(axis=1)
-    return pf.dropna()
+MARKET_TZ = "Asia/Kolkata"
 
+qs.extend_pandas()
 
 def compute_portfolio_metrics(portfolio_value: pd.Series, buy_price: dict = None, latest_price: dict = None, shares: dict = None, buy_date_actual: dict = None, risk_free_rate: float = 0.0526): 
 
@@ -65,36 +60,114 @@ def compute_portfolio_metrics(portfolio_value: pd.Series, buy_price: dict = None
     except Exception:
         metrics["max_dd"] = np.nan
 
-    if buy_price and latest_price and shares and buy_date_actual:
-        total_invested = 0.0
-        total_current = 0.0
-        latest_buy_date = None
+    metrics.update(investor_pnl(buy_price, latest_price, shares, buy_date_actual))
+    return metrics
 
-        for t in buy_price:
-            bp = buy_price.get(t)
-            lp = latest_price.get(t)
-            sh = shares.get(t, 0)
-            bd = buy_date_actual.get(t)
 
-            if bp not in (None, 0) and lp not in (None, 0) and sh > 0:
-                total_invested += bp * sh
-                total_current += lp * sh
+def investor_pnl(buy_price: dict = None, latest_price: dict = None, shares: dict = None, buy_date_actual: dict = None) -> dict:
+    if not (buy_price and latest_price and shares and buy_date_actual):
+        return {}
 
-                if bd is not None:
-                    if latest_buy_date is None or bd > latest_buy_date:
-                        latest_buy_date = bd
+    total_invested = 0.0
+    total_current = 0.0
 
-        if total_invested > 0:
-            investor_cum_return = (total_current / total_invested) - 1
-        else:
-            investor_cum_return = 0.0
+    for t in buy_price:
+        bp = buy_price.get(t)
+        lp = latest_price.get(t)
+        sh = shares.get(t, 0)
+
+        if bp not in (None, 0) and lp not in (None, 0) and sh > 0:
+            total_invested += bp * sh
+            total_current += lp * sh
 
-        metrics["cumulative_return"] = investor_cum_return
+    if total_invested > 0:
+        investor_cum_return = (total_current / total_invested) - 1
+    else:
+        investor_cum_return = 0.0
 
-        pf_val = total_current - total_invested if total_invested > 0 else 0
-        metrics["pf_gain_loss"] = pf_val
+    pf_val = total_current - total_invested if total_invested > 0 else 0
+    return {"cumulative_return": investor_cum_return, "pf_gain_loss": pf_val}
 
-    return metrics
+
+def apply_live_bar(price_df: pd.DataFrame, latest_price: dict, today: pd.Timestamp = None) -> pd.DataFrame:
+    if price_df is None or price_df.empty:
+        return price_df
+
+    today = pd.Timestamp(today if today is not None else pd.Timestamp.now(tz=MARKET_TZ).tz_localize(None)).normalize()
+    live = pd.Series({t: latest_price.get(t) for t in price_df.columns}, dtype=float).dropna()
+    row = price_df.iloc[-1].copy()
+    row.update(live)
+
+    if price_df.index[-1] >= today:
+        out = price_df.copy()
+        out.iloc[-1] = row
+        return out
+    # before the open and on exchange holidays the quote is still the last close, so there is no new session to add
+    last = price_df.iloc[-1][live.index].to_numpy(dtype=float)
+    moved = not np.allclose(live.to_numpy(dtype=float), last, rtol=0, atol=1e-9, equal_nan=True)
+    if np.is_busday(today.date()) and moved:
+        return pd.concat([price_df, row.to_frame(today).T])
+    return price_df
+
+
+class IncrementalPortfolioMetrics:
+    def __init__(self, history: pd.Series, risk_free_rate: float = 0.0526):
+        self.history = history
+        self.risk_free_rate = risk_free_rate
+        self.returns = history.pct_change().dropna()
+        self.log_returns = np.log(history / history.shift(1)).dropna()
+
+        lr = self.log_returns.to_numpy(dtype=float)
+        neg = lr[lr < 0]
+        self.n, self.mean, self.m2 = len(lr), (lr.mean() if len(lr) else 0.0), ((lr - lr.mean()) ** 2).sum() if len(lr) else 0.0
+        self.neg_n, self.neg_mean, self.neg_m2 = len(neg), (neg.mean() if len(neg) else 0.0), ((neg - neg.mean()) ** 2).sum() if len(neg) else 0.0
+
+        roll_max = history.cummax()
+        self.peak = float(roll_max.iloc[-1]) if not history.empty else np.nan
+        self.min_dd = float(((history - roll_max) / roll_max).min()) if not history.empty else np.nan
+
+    @staticmethod
+    def _welford(n, mean, m2, x):
+        n += 1
+        delta = x - mean
+        mean += delta / n
+        m2 += delta * (x - mean)
+        return n, mean, m2
+
+    def update(self, date: pd.Timestamp, value: float, buy_price: dict = None, latest_price: dict = None, shares: dict = None, buy_date_actual: dict = None) -> dict:
+        if len(self.history) < 2:
+            pf_value = pd.concat([self.history, pd.Series([value], index=[date])])
+            return compute_portfolio_metrics(pf_value, buy_price, latest_price, shares, buy_date_actual, self.risk_free_rate)
+
+        prev = float(self.history.iloc[-1])
+        r = value / prev - 1
+        lr = np.log(value / prev)
+
+        n, mean, m2 = self._welford(self.n, self.mean, self.m2, lr)
+        neg_n, neg_mean, neg_m2 = (self._welford(self.neg_n, self.neg_mean, self.neg_m2, lr) if lr < 0 else (self.neg_n, self.neg_mean, self.neg_m2))
+        std = np.sqrt(m2 / (n - 1)) if n > 1 else np.nan
+
+        metrics = {"returns": pd.concat([self.returns, pd.Series([r], index=[date])]),
+                   "log_returns": pd.concat([self.log_returns, pd.Series([lr], index=[date])])}
+        metrics["volatility"] = std * np.sqrt(252)
+
+        years = (date - self.history.index[0]).days / 365.25
+        metrics["cagr"] = (value / float(self.history.iloc[0])) ** (1 / years) - 1
+
+        daily_rf = self.risk_free_rate / 252
+        metrics["sharpe"] = ((mean - daily_rf) / std) * np.sqrt(252) if std else np.nan
+
+        if neg_n > 1:
+            downside_vol = np.sqrt(neg_m2 / (neg_n - 1)) * np.sqrt(252)
+            metrics["sortino"] = (metrics["cagr"] - self.risk_free_rate) / downside_vol
+        else:
+            metrics["sortino"] = np.nan
+
+        peak = max(self.peak, value)
+        metrics["max_dd"] = min(self.min_dd, (value - peak) / peak)
+
+        metrics.update(investor_pnl(buy_price, latest_price, shares, buy_date_actual))
+        return metrics
 
 
 def compute_rsi(series: pd.Series, period: int = 14) -> pd.Series:
@@ -169,7 +242,26 @@ def compute_adx(df: pd.DataFrame, period: int = 14) -> pd.Series:
     return adx
 
 
+def trend_labels(last, ma20, ma50, slope20, rsi, adx):
+    last, ma20, ma50, slope20, rsi, adx = (np.asarray(v, dtype=float) for v in (last, ma20, ma50, slope20, rsi, adx))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        strong = adx > 25
+        conditions = [strong & (last > ma20) & (last > ma50) & (slope20 > 0) & (rsi > 55),
+                      strong & (last > ma20) & (slope20 > 0),
+                      strong & (last < ma20) & (last < ma50) & (slope20 < 0),
+                      strong & (last < ma20) & (slope20 < 0),
+                      strong,
+                      np.abs(last - ma20) / last < 0.01,
+                      last > ma20]
+    choices = ["Strong Bullish", "Bullish", "Strong Bearish", "Bearish", "Neutral", "Range-Bound", "Weak Bullish"]
+    return np.select(conditions, choices, default="Weak Bearish")
+
+
 def classify_trend(df):
+    if isinstance(df, IndicatorState):
+        snap = df.snapshot()
+        return str(trend_labels(snap["Last"], snap["EMA20"], snap["SMA50"], snap["EMA20 Slope"], snap["RSI"], snap["ADX"]))
+
     close = df["Close"]
 
     ma20 = close.ewm(span=20, adjust=False).mean()
@@ -180,208 +272,278 @@ def classify_trend(df):
     rsi = compute_rsi(close).iloc[-1]
     adx = compute_adx(df).iloc[-1]
 
-    last = close.iloc[-1]
-    last_ma20 = ma20.iloc[-1]
-    last_ma50 = ma50.iloc[-1]
-    ma20_slope = slope20.iloc[-1]
-
-    if adx > 25:  
-        if last > last_ma20 and last > last_ma50 and ma20_slope > 0 and rsi > 55:
-            return "Strong Bullish"
-        elif last > last_ma20 and ma20_slope > 0:
-            return "Bullish"
-        elif last < last_ma20 and last < last_ma50 and ma20_slope < 0:
-            return "Strong Bearish"
-        elif last < last_ma20 and ma20_slope < 0:
-            return "Bearish"
-    else:
-        if abs(last - last_ma20) / last < 0.01:  
-            return "Range-Bound"
-        elif last > last_ma20:
-            return "Weak Bullish"
-        else:
-            return "Weak Bearish"
-    return "Neutral"
-
-
-def compute_position_health(price_dict: dict):
+    return str(trend_labels(close.iloc[-1], ma20.iloc[-1], ma50.iloc[-1], slope20.iloc[-1], rsi, adx))
 
-    records = []
 
+def _pack_panel(price_dict: dict):
+    tickers, frames = [], []
     for t, df in (price_dict or {}).items():
         if df is None or (hasattr(df, "empty") and df.empty):
             continue
-
         try:
             df = df[["High", "Low", "Close"]].dropna().astype(float)
         except Exception:
             continue
-
         if df.empty:
             continue
+        tickers.append(t)
+        frames.append(df.to_numpy())
 
-        close = df["Close"]
-
-        rsi_series = compute_rsi(close)
-        rsi = None
-        if not rsi_series.empty:
-            rsi_valid = rsi_series.dropna()
-            if not rsi_valid.empty:
-                try:
-                    rsi = float(rsi_valid.iloc[-1])
-                except Exception:
-                    rsi = None
-
-        rsi_cat = get_rsi_category(rsi) if rsi is not None else None
-
-        trend_class = classify_trend(df)
-
-        momentum_20d = None
-        if len(close) > 20:
-            try:
-                prev = float(close.iloc[-20])
-                if prev != 0:
-                    momentum_20d = (float(close.iloc[-1]) - prev) / prev
-                else:
-                    momentum_20d = None
-            except Exception:
-                momentum_20d = None
-
-        high_52w = None
-        low_52w = None
-
-        if len(df) >= 252:
-            try:
-                window = df.iloc[-252:]
-                high_52w = float(window["High"].max())
-                low_52w = float(window["Low"].min())
-
-            except Exception:
-                high_52w = None
-                low_52w = None
-
-        last_price = None
-        try:
-            last_price = float(df["Close"].iloc[-1])
-        except Exception:
-            last_price = None
-
-        pct_from_high = None
-        pct_from_low = None
-        if last_price is not None and high_52w not in (None, 0):
-            try:
-                pct_from_high = (last_price - high_52w) / high_52w
-            except Exception:
-                pct_from_high = None
-        if last_price is not None and low_52w not in (None, 0):
-            try:
-                pct_from_low = (last_price - low_52w) / low_52w
-            except Exception:
-                pct_from_low = None
-
-        records.append({"Ticker": t,
-                        "Trend": trend_class,
-                        "RSI": rsi,
-                        "RSI Category": rsi_cat,
-                        "20D Momentum %": momentum_20d,
-                        "52W High": high_52w,
-                        "% from 52W High": pct_from_high,
-                        "52W Low": low_52w, 
-                        "% from 52W Low": pct_from_low})
-    df = pd.DataFrame(records)
-    return df
-
-
-def portfolio_unrealized_pnl(price_df: pd.DataFrame, shares: dict, buy_price: dict, buy_date: dict):
-    if price_df is None or price_df.empty:
-        return pd.DataFrame()
+    lengths = np.array([len(f) for f in frames], dtype=int)
+    panel = np.full((3, lengths.max() if len(frames) else 0, len(frames)), np.nan)
+    for j, f in enumerate(frames):
+        panel[:, :len(f), j] = f.T
+    return tickers, panel, lengths
 
-    tickers = [t for t in price_df.columns if t in shares]
-    if not tickers:
-        return pd.DataFrame()
 
-    pnl_df = pd.DataFrame(index=price_df.index)
-    total_pnl = pd.Series(0.0, index=price_df.index)
+def _ewm_panel(x: np.ndarray, alpha: float, lengths: np.ndarray, start: int = 0) -> np.ndarray:
+    rows = np.arange(x.shape[0])[:, None]
+    inside = (rows >= start) & (rows < lengths[None, :])
+    out = np.full_like(x, np.nan)
+    if x.shape[0] <= start:
+        return out
 
-    for t in tickers:
-        s = shares.get(t, 0)
-        bp = safe_float(buy_price.get(t)) if buy_price is not None else None
-        if bp is None or s == 0:
-            continue
-        per_share = price_df[t].astype(float) - float(bp)
-        series_pnl = per_share * float(s)
-        total_pnl = total_pnl.add(series_pnl, fill_value=0.0)
+    body = np.where(inside, x, 0.0)[start:]
+    zi = ((1 - alpha) * body[0])[None, :]
+    smoothed, _ = lfilter([alpha], [1, alpha - 1], body, axis=0, zi=zi)
+    out[start:] = smoothed
 
-    pnl_df["Unrealized_PnL"] = total_pnl
-    return pnl_df
+    gaps = (np.isnan(x) & inside).any(axis=0)
+    for j in np.flatnonzero(gaps):
+        out[:lengths[j], j] = pd.Series(x[:lengths[j], j]).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    out[~(rows < lengths[None, :])] = np.nan
+    return out
 
 
-def compute_stock_risk_metrics(price_df: pd.DataFrame, market_df: pd.DataFrame):
+def compute_indicator_panel(price_dict: dict, period: int = 14) -> pd.DataFrame:
+    tickers, panel, lengths = _pack_panel(price_dict)
+    if not tickers:
+        return pd.DataFrame()
+
+    high, low, close = panel
+    cols = np.arange(len(tickers))
+    last_row = lengths - 1
+    at = lambda arr, offset=0: arr[np.maximum(last_row - offset, 0), cols]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        delta = np.diff(close, axis=0, prepend=np.nan)
+        avg_gain = _ewm_panel(np.clip(delta, 0, None), 1 / period, lengths, start=1)
+        avg_loss = _ewm_panel(-np.clip(delta, None, 0), 1 / period, lengths, start=1)
+        rsi = 100 - 100 / (1 + at(avg_gain) / at(avg_loss))
+
+        up_move = np.diff(high, axis=0, prepend=np.nan)
+        down_move = -np.diff(low, axis=0, prepend=np.nan)
+        plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+        minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+        prev_close = np.vstack([np.full((1, len(tickers)), np.nan), close[:-1]])
+        tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+        atr = _ewm_panel(tr, 1 / period, lengths)
+        plus_di = 100 * _ewm_panel(plus_dm, 1 / period, lengths) / atr
+        minus_di = 100 * _ewm_panel(minus_dm, 1 / period, lengths) / atr
+        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+        adx = at(_ewm_panel(dx, 1 / period, lengths, start=1))
+
+        short = lengths < period + 1
+        rsi[short] = np.nan
+        adx[short] = np.nan
+
+        ma20 = _ewm_panel(close, 2 / 21, lengths)
+        slope20 = np.where(lengths > 1, at(ma20) - at(ma20, 1), np.nan)
+        csum = np.vstack([np.zeros((1, len(tickers))), np.nancumsum(close, axis=0)])
+        ma50 = np.where(lengths >= 50, (csum[lengths, cols] - csum[np.maximum(lengths - 50, 0), cols]) / 50, np.nan)
+
+        last = at(close)
+        prev20 = at(close, 19)
+        momentum = np.where((lengths > 20) & (prev20 != 0), (last - prev20) / prev20, np.nan)
+
+        window = np.maximum(lengths - 252, 0)[None, :] + np.arange(min(252, panel.shape[1]))[:, None]
+        window = np.minimum(window, panel.shape[1] - 1)
+        high_52w = np.where(lengths >= 252, np.take_along_axis(high, window, axis=0).max(axis=0), np.nan)
+        low_52w = np.where(lengths >= 252, np.take_along_axis(low, window, axis=0).min(axis=0), np.nan)
+
+    return pd.DataFrame({"Ticker": tickers,
+                         "Last": last,
+                         "RSI": rsi,
+                         "ADX": adx,
+                         "EMA20": at(ma20),
+                         "EMA20 Slope": slope20,
+                         "SMA50": ma50,
+                         "20D Momentum %": momentum,
+                         "52W High": high_52w,
+                         "52W Low": low_52w})
+
+
+def compute_position_health(price_dict: dict, states: dict = None):
+    if states:
+        ind = pd.DataFrame([{"Ticker": t, **state.snapshot()} for t, state in states.items() if state.count])
+    else:
+        ind = compute_indicator_panel(price_dict)
+    if ind.empty:
+        return pd.DataFrame()
+
+    rsi = ind["RSI"].to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pct_from_high = np.where(ind["52W High"] != 0, (ind["Last"] - ind["52W High"]) / ind["52W High"], np.nan)
+        pct_from_low = np.where(ind["52W Low"] != 0, (ind["Last"] - ind["52W Low"]) / ind["52W Low"], np.nan)
+
+    return pd.DataFrame({"Ticker": ind["Ticker"],
+                         "Trend": trend_labels(ind["Last"], ind["EMA20"], ind["SMA50"], ind["EMA20 Slope"], rsi, ind["ADX"]),
+                         "RSI": rsi,
+                         "RSI Category": np.select([np.isnan(rsi), rsi >= 70, rsi <= 30], [None, "Overbought", "Oversold"], default="Neutral"),
+                         "20D Momentum %": ind["20D Momentum %"],
+                         "52W High": ind["52W High"],
+                         "% from 52W High": pct_from_high,
+                         "52W Low": ind["52W Low"],
+                         "% from 52W Low": pct_from_low})
+
+
+def _masked_percentile(values: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    ordered = np.sort(values, axis=0)
+    pos = (q / 100) * (np.maximum(counts, 1) - 1)
+    lo = np.floor(pos).astype(int)
+    hi = np.ceil(pos).astype(int)
+    lo_val = np.take_along_axis(ordered, lo[None, :], axis=0)[0] if len(ordered) else np.full(len(counts), np.nan)
+    hi_val = np.take_along_axis(ordered, hi[None, :], axis=0)[0] if len(ordered) else np.full(len(counts), np.nan)
+    return np.where(counts > 0, lo_val + (hi_val - lo_val) * (pos - lo), np.nan)
+
+
+def risk_metrics_matrix(log_returns: np.ndarray, market_log_returns: np.ndarray, prices: np.ndarray, min_obs: int = 50) -> dict:
+    valid = np.isfinite(log_returns) & np.isfinite(market_log_returns)[:, None]
+    n = valid.sum(axis=0)
+    x = np.where(valid, log_returns, 0.0)
+    m = np.where(valid, market_log_returns[:, None], 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean_x = x.sum(axis=0) / n
+        mean_m = m.sum(axis=0) / n
+        dx = np.where(valid, x - mean_x, 0.0)
+        dm = np.where(valid, m - mean_m, 0.0)
+        var_x = (dx ** 2).sum(axis=0) / n
+        var_m = (dm ** 2).sum(axis=0) / n
+        cov = (dx * dm).sum(axis=0) / n
+        beta = np.where(var_m != 0, cov / var_m, np.nan)
+
+        var_cutoff = _masked_percentile(np.where(valid, log_returns, np.nan), n, 5)
+        tail = valid & (log_returns <= var_cutoff)
+        tail_n = tail.sum(axis=0)
+        cvar = np.where(tail_n > 0, -np.where(tail, log_returns, 0.0).sum(axis=0) / tail_n, np.nan)
+
+        filled = pd.DataFrame(prices).ffill().to_numpy()
+        first = np.argmax(np.isfinite(prices), axis=0)
+        filled[first, np.arange(filled.shape[1])] = np.nan
+        peak = np.fmax.accumulate(filled, axis=0)
+        max_dd = np.abs(np.nanmin(filled / peak - 1, axis=0))
+
+    return {"n": n,
+            "volatility": np.sqrt(var_x) * np.sqrt(252),
+            "beta": beta,
+            "max_drawdown": max_dd,
+            "var_95": -var_cutoff,
+            "cvar_95": cvar,
+            "annual_return": mean_x * 252,
+            "enough": n >= min_obs}
+
+
+def compute_stock_risk_metrics(price_df: pd.DataFrame, market_df: pd.DataFrame, log_returns: pd.DataFrame = None):
     if price_df.empty or market_df.empty:
         return pd.DataFrame()
-    
+
     try:
-        market_log_rtn = np.log(market_df["Close"] /  market_df["Close"].shift(1)).dropna()
+        market_log_rtn = np.log(market_df["Close"] / market_df["Close"].shift(1))
     except Exception:
         return pd.DataFrame()
 
-    log_returns = np.log(price_df / price_df.shift(1)).dropna()
-    records = []
-    
-    for t in price_df.columns:
-        ser = log_returns[t].dropna()
-        if ser.empty:
-            continue
-        
-        market_log = market_log_rtn.reindex(ser.index).dropna()
-        combined = pd.concat([ser, market_log], axis=1, join="inner").dropna()
-        if len(combined) < 50:
-            continue
+    prices = price_df.astype(float)
+    if log_returns is None:
+        log_returns = np.log(prices / prices.shift(1)).iloc[1:]
+    market = market_log_rtn.reindex(log_returns.index).to_numpy(dtype=float)
+    res = risk_metrics_matrix(log_returns.to_numpy(dtype=float), market, prices.to_numpy())
 
-        stock_rtn = combined.iloc[:, 0]
-        mkt_rtn = combined.iloc[:, 1]
+    keep = res["enough"]
+    return pd.DataFrame({"Ticker": prices.columns[keep],
+                         "Volatility (Annualized)": res["volatility"][keep],
+                         "Beta": res["beta"][keep],
+                         "Max Drawdown": res["max_drawdown"][keep],
+                         "VaR 95%": res["var_95"][keep],
+                         "CVaR 95%": res["cvar_95"][keep],
+                         "Return (Annualized)": res["annual_return"][keep]})
 
-        vol = stock_rtn.std(ddof=0) * np.sqrt(252)
 
-        cov = np.cov(stock_rtn, mkt_rtn, ddof=0)[0, 1]
-        var_pf = np.var(mkt_rtn, ddof=0)
-        beta = cov / var_pf if var_pf != 0 else np.nan
+ROLLING_WINDOWS = (20, 60, 120, 252)
 
-        returns = price_df[t].pct_change().dropna()
-        cumulative = (1 + returns).cumprod()
-        rolling_max = cumulative.cummax()
-        drawdown = (cumulative - rolling_max) / rolling_max
-        max_dd = drawdown.min()
 
-        var_cutoff = np.percentile(stock_rtn, 5)
-        var_95 = -var_cutoff
-        tail_losses = stock_rtn[stock_rtn <= var_cutoff]
-        cvar_95 = -tail_losses.mean() if not tail_losses.empty else np.nan
-        
-        records.append({"Ticker": t,
-                        "Volatility (Annualized)": vol,
-                        "Beta": beta,
-                        "Max Drawdown": abs(max_dd),
-                        "VaR 95%": var_95,
-                        "CVaR 95%": cvar_95,
-                        "Returns": stock_rtn})
+def _prefix(values: np.ndarray) -> np.ndarray:
+    return np.vstack([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
 
-    df = pd.DataFrame(records)
-    df = df.dropna(subset=["Ticker"])
-    return df
 
-
-def compute_rolling_metrics(log_returns: pd.Series, window: int = 60, risk_free_rate: float = 0.0655):
-    daily_rf = risk_free_rate / 252
-    excess = log_returns - daily_rf
-    rolling_mean = excess.rolling(window).mean()
-    roll_std = excess.rolling(window).std()
-
-    rolling_vol = roll_std * np.sqrt(252)
-    rolling_sharpe = ((rolling_mean * 252) / (roll_std* np.sqrt(252)))
-    return rolling_vol, rolling_sharpe
+def _window_sum(prefix: np.ndarray, window: int) -> np.ndarray:
+    out = np.full((prefix.shape[0] - 1, prefix.shape[1]), np.nan)
+    if window < prefix.shape[0]:
+        out[window - 1:] = prefix[window:] - prefix[:-window]
+    return out
 
 
+def rolling_analytics(log_returns: pd.DataFrame, market_log_returns: pd.Series = None, windows=ROLLING_WINDOWS, risk_free_rate: float = 0.0655) -> dict:
+    if isinstance(log_returns, pd.Series):
+        log_returns = log_returns.to_frame()
+    index, columns = log_returns.index, log_returns.columns
+    daily_rf = risk_free_rate / 252
 
+    x = log_returns.to_numpy(dtype=float) - daily_rf
+    valid = ~np.isnan(x)
+    center = np.nanmean(np.where(valid, x, np.nan), axis=0) if valid.any() else np.zeros(x.shape[1])
+    center = np.nan_to_num(center)
+    xc = np.where(valid, x - center, 0.0)
+
+    sums = {"n": _prefix(valid.astype(float)),
+            "x": _prefix(xc),
+            "xx": _prefix(xc * xc),
+            "down": _prefix(np.where(valid, np.minimum(x, 0.0), 0.0) ** 2)}
+
+    has_market = market_log_returns is not None and not market_log_returns.empty
+    if has_market:
+        m = market_log_returns.reindex(index).to_numpy(dtype=float)[:, None]
+        joint = valid & ~np.isnan(m)
+        m_center = np.nanmean(m) if (~np.isnan(m)).any() else 0.0
+        mc = np.where(joint, m - m_center, 0.0)
+        xj = np.where(joint, xc, 0.0)
+        sums.update({"jn": _prefix(joint.astype(float)),
+                     "jx": _prefix(xj),
+                     "jm": _prefix(mc),
+                     "jxx": _prefix(xj * xj),
+                     "jmm": _prefix(mc * mc),
+                     "jxm": _prefix(xj * mc)})
+
+    out = {}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for w in windows:
+            s = {k: _window_sum(v, w) for k, v in sums.items()}
+            full = s["n"] == w
+            mean = s["x"] / w
+            var = (s["xx"] - w * mean ** 2) / (w - 1)
+            std = np.sqrt(np.clip(var, 0, None))
+            excess_mean = mean + center
+            downside = np.sqrt(s["down"] / w)
+
+            result = {"volatility": np.where(full, std * np.sqrt(252), np.nan),
+                      "sharpe": np.where(full, excess_mean * 252 / (std * np.sqrt(252)), np.nan),
+                      "sortino": np.where(full, excess_mean * 252 / (downside * np.sqrt(252)), np.nan)}
+
+            if has_market:
+                jfull = s["jn"] == w
+                mx, mm = s["jx"] / w, s["jm"] / w
+                cov = s["jxm"] / w - mx * mm
+                var_x = s["jxx"] / w - mx ** 2
+                var_m = s["jmm"] / w - mm ** 2
+                result["beta"] = np.where(jfull, cov / var_m, np.nan)
+                result["correlation"] = np.where(jfull, cov / np.sqrt(np.clip(var_x, 0, None) * np.clip(var_m, 0, None)), np.nan)
+
+            out[w] = {k: pd.DataFrame(v, index=index, columns=columns) for k, v in result.items()}
+    return out
 
 
+def compute_rolling_metrics(log_returns: pd.Series, window: int = 60, risk_free_rate: float = 0.0655):
+    rolling = rolling_analytics(log_returns.to_frame(), windows=(window,), risk_free_rate=risk_free_rate)[window]
+    return rolling["volatility"].iloc[:, 0], rolling["sharpe"].iloc[:, 0]
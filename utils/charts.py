@@ -1,13 +1,17 @@
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
+from utils.figure_cache import cached_figure
+from utils.downsample import MAX_POINTS_PER_TRACE, downsample_frame, downsample_series
 
 
 PALETTE = px.colors.qualitative.D3
 CONTINUOUS_SCALE = px.colors.sequential.Teal
 COMMON_TEMPLATE = 'plotly_dark'
+HEATMAP_LABEL_LIMIT = 30
 
 
+@cached_figure
 def pie_chart(labels, values, title=None):
     fig = px.pie(names=labels, values=values, template=COMMON_TEMPLATE)
     fig.update_traces(hoverinfo='label+percent', textinfo='label', pull=[0.03] * len(values))
@@ -15,13 +19,19 @@ def pie_chart(labels, values, title=None):
     return fig
 
 
-def line_chart(df, x, y, color=None, title=None, labels=None, markers=None):
+@cached_figure
+def line_chart(df, x, y, color=None, title=None, labels=None, markers=None, max_points=MAX_POINTS_PER_TRACE):
+    if isinstance(y, (list, tuple)):
+        df, y, color = df.melt(id_vars=x, value_vars=list(y)), "value", "variable"
+    df = downsample_frame(df, y, color, max_points)
     fig = px.line(df, x=x, y=y, color=color, template=COMMON_TEMPLATE, labels=labels, color_discrete_sequence=PALETTE, markers=markers)
     fig.update_layout(margin=dict(t=60, b=60), title=title or "", legend=dict(orientation='h', yanchor='bottom', y=-0.3, xanchor='center', x=0.5))
     return fig
 
 
-def area_chart(x, y, title=None, underwater=False):
+@cached_figure
+def area_chart(x, y, title=None, underwater=False, max_points=MAX_POINTS_PER_TRACE):
+    x, y = downsample_series(x, y, max_points)
     fig = px.area(x=x, y=y, template=COMMON_TEMPLATE, labels={"x": "Date", "y": "Drawdown %"}, color_discrete_sequence=PALETTE)
     fig.update_traces(line=dict(width=2))
     fig.update_layout(title=title or "", margin=dict(t=60, b=60))
@@ -29,6 +39,7 @@ def area_chart(x, y, title=None, underwater=False):
     return fig
 
 
+@cached_figure
 def scatter_plot(df, x, y, color=None, size=None, title=None, hover=None, trendline=None, reference_line=False ):
     fig = px.scatter(df, x=x, y=y, hover_name=hover, color=color, size=size, template=COMMON_TEMPLATE, title=title or "", trendline=trendline, color_discrete_sequence=PALETTE,)
     fig.update_traces(mode="markers", marker=dict(size=12, opacity=0.85, line=dict(width=0.5, color="#ffffff")))
@@ -45,22 +56,27 @@ def scatter_plot(df, x, y, color=None, size=None, title=None, hover=None, trendl
     return fig
 
 
+@cached_figure
 def heatmap_chart(df, title=None):
-    fig = px.imshow(df, text_auto=".2f", color_continuous_scale=CONTINUOUS_SCALE, template=COMMON_TEMPLATE, title=title or "")
+    fig = px.imshow(df, text_auto=".2f" if len(df.columns) <= HEATMAP_LABEL_LIMIT else False, color_continuous_scale=CONTINUOUS_SCALE, template=COMMON_TEMPLATE, title=title or "")
     fig.update_traces(hovertemplate=("<b>%{x}</b> vs <b>%{y}</b><br>"
                                      "Correlation: <b>%{z:.4f}</b><extra></extra>"))
     fig.update_layout(margin=dict(t=60, b=60))
     return fig
 
 
-def dual_axis_line_chart(df, x, y1, y2, y1_name="Series 1", y2_name="Series 2", title=None):
+@cached_figure
+def dual_axis_line_chart(df, x, y1, y2, y1_name="Series 1", y2_name="Series 2", title=None, max_points=MAX_POINTS_PER_TRACE):
+    x1, v1 = downsample_series(df[x], df[y1], max_points)
+    x2, v2 = downsample_series(df[x], df[y2], max_points)
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df[x], y=df[y1], mode="lines", name=y1_name, line=dict(width=1.5, color=PALETTE[0]), opacity=0.75))
-    fig.add_trace(go.Scatter(x=df[x], y=df[y2], mode="lines", name=y2_name, yaxis="y2", line=dict(width=2, color=PALETTE[2]),))
+    fig.add_trace(go.Scatter(x=x1, y=v1, mode="lines", name=y1_name, line=dict(width=1.5, color=PALETTE[0]), opacity=0.75))
+    fig.add_trace(go.Scatter(x=x2, y=v2, mode="lines", name=y2_name, yaxis="y2", line=dict(width=2, color=PALETTE[2]),))
     fig.update_layout(title=title or "", template=COMMON_TEMPLATE, xaxis=dict(title=x), yaxis=dict(title=y1_name), yaxis2=dict(title=y2_name, overlaying="y", side="right"), legend=dict(orientation="h", y=-0.2), margin=dict(t=60, b=60),)
     return fig
 
 
+@cached_figure
 def bubble_chart(df, x, y, size, color=None, hover=None, title=None, reference_line=False):
     fig = px.scatter(df, x=x, y=y, size=size, color=color, hover_name=hover, template=COMMON_TEMPLATE, title=title or "", size_max=60, color_discrete_sequence=PALETTE,)
     fig.update_traces(mode="markers", marker=dict(opacity=0.85))
@@ -73,6 +89,7 @@ def bubble_chart(df, x, y, size, color=None, hover=None, title=None, reference_l
     return fig
 
 
+@cached_figure
 def box_chart(df,x_col, y_col, title, hover_label_col=None, color_col=None):
     custom = None
     hovertemplate = "%{y:.2f}"
@@ -87,6 +104,7 @@ def box_chart(df,x_col, y_col, title, hover_label_col=None, color_col=None):
     return fig
 
 
+@cached_figure
 def bar_chart(df, x, y, orientation=None, color=None, title=None, labels=None, show_text=False, hover_col=None, hover_title=None):
     hover_data = {}
     if hover_col:
@@ -99,4 +117,14 @@ def bar_chart(df, x, y, orientation=None, color=None, title=None, labels=None, s
     if hover_title:    
         fig.update_traces(hovertemplate="<b>%{customdata}</b><br>" + "%{hovertext}<extra></extra>")
     fig.update_layout(title=title or "", margin=dict(t=60, b=60),  xaxis_title=labels.get(x) if labels else x, yaxis_title=labels.get(y) if labels else y)
-    return fig
\ No newline at end of file
+    return fig
+
+@cached_figure
+def frontier_chart(frontier, points, title=None):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=frontier["Volatility"], y=frontier["Return"], mode="lines", name="Efficient Frontier", line=dict(width=2, color=PALETTE[0])))
+    for i, row in enumerate(points.itertuples(index=False)):
+        fig.add_trace(go.Scatter(x=[row.Volatility], y=[row.Return], mode="markers", name=row.Portfolio, marker=dict(size=14, color=PALETTE[(i + 1) % len(PALETTE)], line=dict(width=1, color="#ffffff"))))
+    fig.update_traces(hovertemplate="Volatility: %{x:.2%}<br>Return: %{y:.2%}")
+    fig.update_layout(title=title or "", template=COMMON_TEMPLATE, xaxis=dict(title="Volatility (Annualized)", tickformat=".0%"), yaxis=dict(title="Return (Annualized)", tickformat=".0%"), legend=dict(orientation="h", y=-0.2), margin=dict(t=60, b=60))
+    return fig
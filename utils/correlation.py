@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+from scipy.cluster.hierarchy import linkage, leaves_list
+from scipy.spatial.distance import squareform
+
+BLOCK_SIZE = 256
+FLOAT32_ABOVE = 200
+
+
+def correlation_matrix(log_returns: pd.DataFrame, dtype=None, block_size: int = BLOCK_SIZE, min_periods: int = 2) -> pd.DataFrame:
+    columns = log_returns.columns
+    n = len(columns)
+    if dtype is None:
+        dtype = np.float32 if n > FLOAT32_ABOVE else np.float64
+
+    values = log_returns.to_numpy(dtype=np.float64)
+    mask = ~np.isnan(values)
+    center = np.where(mask, values, 0.0).sum(axis=0) / np.maximum(mask.sum(axis=0), 1)
+    x = np.where(mask, values - center, 0.0).astype(dtype)
+    m = mask.astype(dtype)
+    xx = x * x
+
+    corr = np.full((n, n), np.nan, dtype=dtype)
+    for i in range(0, n, block_size):
+        bi = slice(i, min(i + block_size, n))
+        for j in range(i, n, block_size):
+            bj = slice(j, min(j + block_size, n))
+            count = m[:, bi].T @ m[:, bj]
+            sum_x = x[:, bi].T @ m[:, bj]
+            sum_y = m[:, bi].T @ x[:, bj]
+            sum_xx = xx[:, bi].T @ m[:, bj]
+            sum_yy = m[:, bi].T @ xx[:, bj]
+            sum_xy = x[:, bi].T @ x[:, bj]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                cov = count * sum_xy - sum_x * sum_y
+                var = (count * sum_xx - sum_x ** 2) * (count * sum_yy - sum_y ** 2)
+                block = np.clip(cov / np.sqrt(np.clip(var, 0, None)), -1, 1)
+            block[count < min_periods] = np.nan
+            corr[bi, bj] = block
+            corr[bj, bi] = block.T
+
+    return pd.DataFrame(corr, index=columns, columns=columns)
+
+
+def cluster_order(corr: pd.DataFrame, method: str = "average") -> list:
+    if len(corr) < 3:
+        return list(corr.columns)
+    values = np.nan_to_num(corr.to_numpy(dtype=np.float64), nan=0.0)
+    np.fill_diagonal(values, 1.0)
+    distance = np.sqrt(np.clip(0.5 * (1 - values), 0, None))
+    distance = (distance + distance.T) / 2
+    np.fill_diagonal(distance, 0.0)
+    order = leaves_list(linkage(squareform(distance, checks=False), method=method))
+    return corr.columns[order].tolist()
+
+
+def top_pairs(corr: pd.DataFrame, k: int = 10) -> pd.DataFrame:
+    values = corr.to_numpy(dtype=np.float64)
+    rows, cols = np.triu_indices(len(values), k=1)
+    pair_corr = values[rows, cols]
+    keep = ~np.isnan(pair_corr)
+    rows, cols, pair_corr = rows[keep], cols[keep], pair_corr[keep]
+    if pair_corr.size == 0:
+        return pd.DataFrame(columns=["Ticker A", "Ticker B", "Correlation"])
+    k = min(k, pair_corr.size)
+    top = np.argpartition(-np.abs(pair_corr), k - 1)[:k]
+    top = top[np.argsort(-np.abs(pair_corr[top]))]
+    return pd.DataFrame({"Ticker A": corr.columns[rows[top]],
+                         "Ticker B": corr.columns[cols[top]],
+                         "Correlation": pair_corr[top]})
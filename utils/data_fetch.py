@@ -1,22 +1,32 @@
-import yfinance as yf
+import os
+import time
+import threading
 import pandas as pd
 import streamlit as st
-from yahooquery import Ticker as yqt
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from dotenv import load_dotenv
-from typing import Tuple, Dict
+from typing import Callable, Tuple, Dict, List
+from utils.price_store import read_prices
+from utils.fundamentals_store import load_fundamentals, save_fundamentals
+from utils.providers import get_provider
+from utils.quotes import live_prices
+from utils.ticker_search import TickerIndex
+from utils.resilience import FetchError, resilient_call
 
 load_dotenv() 
 
-@st.cache_data(show_spinner=False)
-def load_tickers(path: str = "Tickers.xlsx") -> pd.Series:
-    try:
-        df = pd.read_excel(path)
-    except Exception:
-        return pd.DataFrame(columns=["Symbol", "Company Name", "Sector", "Industry"])
+FETCH_WORKERS = 8
+FETCH_TIMEOUT = 20
 
+TICKER_CACHE_DIR = os.path.join(".cache", "universe")
+TICKER_COLUMNS = ["Symbol", "Company Name", "Sector", "Industry"]
+
+
+def _read_ticker_file(path: str) -> pd.DataFrame:
+    df = pd.read_excel(path)
     df = df.rename(columns=lambda c: c.strip())
-    expected = ["Symbol", "Company Name", "Sector", "Industry"]
-    for col in expected:
+    for col in TICKER_COLUMNS:
         if col not in df.columns:
             df[col] = ""
 
@@ -26,73 +36,104 @@ def load_tickers(path: str = "Tickers.xlsx") -> pd.Series:
     df["Industry"] = df["Industry"].astype(str).fillna("Unknown").str.strip()
     df = df[df["Symbol"] != ""].drop_duplicates(subset=["Symbol"])
     df = df.reset_index(drop=True)
-    return df[["Symbol", "Company Name", "Sector", "Industry"]]
+    return df[TICKER_COLUMNS]
 
 
 @st.cache_data(show_spinner=False)
-def download_price_series(ticker: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+def _load_tickers(path: str, mtime: int) -> pd.DataFrame:
+    cache = os.path.join(TICKER_CACHE_DIR, f"{os.path.basename(path)}.{mtime}.parquet")
+    if os.path.exists(cache):
+        try:
+            return pd.read_parquet(cache)
+        except Exception:
+            pass
     try:
-        df = yf.download(ticker, start=start, end=end, progress=False, auto_adjust=False)
-        if df is None or df.empty:
-             return pd.DataFrame(columns=["High", "Low", "Close"])
-        df = df[["High", "Low", "Close"]].sort_index()
-        df.columns = ["High", "Low", "Close"]
-        return df
+        df = _read_ticker_file(path)
     except Exception:
-        return pd.DataFrame(columns=["High", "Low", "Close"])
-    
+        return pd.DataFrame(columns=TICKER_COLUMNS)
+    try:
+        os.makedirs(TICKER_CACHE_DIR, exist_ok=True)
+        df.to_parquet(cache, index=False)
+    except Exception:
+        pass
+    return df
 
-@st.cache_data(show_spinner=False)
-def fetch_sector_industry(ticker: str) -> dict:
+
+def _ticker_mtime(path: str) -> int:
     try:
-        t = yqt(ticker)
-        profile = t.summary_profile
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
 
-        if profile is None:
-            return {"Sector": "Unknown", "Industry": "Unknown"}
 
-        if not isinstance(profile, dict):
-            return {"Sector": "Unknown", "Industry": "Unknown"}
+def load_tickers(path: str = "Tickers.xlsx") -> pd.DataFrame:
+    return _load_tickers(path, _ticker_mtime(path))
 
-        data = profile.get(ticker, {})
 
-        return {
-            "Sector": data.get("sector", "Unknown"),
-            "Industry": data.get("industry", "Unknown")}
+@st.cache_resource(show_spinner=False)
+def _ticker_index(path: str, mtime: int) -> TickerIndex:
+    return TickerIndex(_load_tickers(path, mtime))
 
-    except Exception:
+
+def load_ticker_index(path: str = "Tickers.xlsx") -> TickerIndex:
+    return _ticker_index(path, _ticker_mtime(path))
+
+
+def download_price_series(ticker: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+    return download_price_batch((ticker,), start, end)[ticker]
+
+
+def download_price_batch(tickers: tuple, start: pd.Timestamp, end: pd.Timestamp, failed: list = None) -> Dict[str, pd.DataFrame]:
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+    provider = get_provider()
+    if not provider.remote:
+        return provider.price_history(tickers, start, end)
+    fetch = lambda group, s, e: resilient_call("history", provider.price_history, group, s, e)
+    return read_prices(tickers, start, end, fetch, failed)
+
+
+@st.cache_data(show_spinner=False)
+def _cached_profile(ticker: str) -> dict:
+    return resilient_call("profile", get_provider().profile, ticker)
+
+
+def fetch_sector_industry(ticker: str) -> dict:
+    try:
+        return _cached_profile(ticker)
+    except FetchError:
         return {"Sector": "Unknown", "Industry": "Unknown"}
 
+
+def _stored_fundamentals(ticker: str) -> dict:
+    stored = load_fundamentals(ticker)
+    if stored is not None:
+        return stored
+    provider = get_provider()
+    data = resilient_call("fundamentals", provider.fundamentals, ticker)
+    if provider.remote:
+        save_fundamentals(ticker, data)
+    return data
+
     
-@st.cache_data(show_spinner=False)
 def fetch_fundamentals(ticker: str) -> dict:
     try:
-        t = yf.Ticker(ticker)
-        income = t.income_stmt
-        income_q = t.quarterly_income_stmt
-        balance = t.balance_sheet
-        cashflow = t.cashflow
-        shares_outstanding = t.get_shares_full()
-        
-        return{"income": income,
-               "income_q": income_q,
-               "balance": balance,
-               "cashbflow": cashflow,
-               "s_o": shares_outstanding}
-    except Exception as e:
+        return _stored_fundamentals(ticker)
+    except FetchError:
         st.warning(f"Fundamentals unavailable for {ticker}")
         return{}
 
-   
+
 @st.cache_data(show_spinner=False)
+def _cached_dividends(ticker: str) -> pd.Series:
+    return resilient_call("dividends", get_provider().dividends, ticker)
+
+   
 def fetch_dividends(ticker: str) -> pd.Series:
     try:
-        t = yf.Ticker(ticker)
-        div = t.dividends
-        if div is None:
-            return pd.Series(dtype=float)
-        return div.sort_index()
-    except Exception:
+        return _cached_dividends(ticker)
+    except FetchError:
         return pd.Series(dtype=float)
     
 
@@ -107,15 +148,48 @@ def first_price_after(series: pd.Series, start_dt: pd.Timestamp):
 
 
 def live_price(ticker: str):
-    try:
-        t = yf.Ticker(ticker)
-        price = t.fast_info["last_price"]
-        return float(price)
-    except Exception:
-        return None
+    return live_prices([ticker]).get(ticker)
+
+
+def fetch_many(func: Callable, tickers: list, default=None, timeout: float = FETCH_TIMEOUT, max_workers: int = FETCH_WORKERS) -> Tuple[dict, List[str]]:
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}, []
+
+    ctx = get_script_run_ctx()
+    started = {}
+
+    def run(t):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        started[t] = time.monotonic()
+        return func(t)
+
+    workers = max(1, min(max_workers, len(tickers)))
+    deadline = time.monotonic() + timeout * -(-len(tickers) // workers)
+    pool = ThreadPoolExecutor(max_workers=workers)
+    futures = {pool.submit(run, t): t for t in tickers}
+    pending = set(futures)
+    results = {}
+    failed = []
+
+    while pending:
+        done, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+        for f in done:
+            try:
+                results[futures[f]] = f.result()
+            except Exception:
+                failed.append(futures[f])
+
+        now = time.monotonic()
+        expired = {f for f in pending if now > deadline or (futures[f] in started and now - started[futures[f]] > timeout)}
+        failed.extend(futures[f] for f in expired)
+        pending -= expired
+
+    pool.shutdown(wait=False, cancel_futures=True)
+    return {t: results.get(t, default) for t in tickers}, failed
 
 
-@st.cache_data(show_spinner=False, ttl=60)
 def fetch_all_data(tickers: list, date_ranges: Dict[str, Tuple[pd.Timestamp, pd.Timestamp]]):
     starts = []
     ends = []
@@ -139,13 +213,15 @@ def fetch_all_data(tickers: list, date_ranges: Dict[str, Tuple[pd.Timestamp, pd.
     latest_price = {}
     missing = []
 
-    try:
-        market_df = download_price_series("^NSEI", global_start, global_end)
-    except Exception:
-        market_df = pd.DataFrame(columns=["High", "Low", "Close"])
+    failed = []
+    batch = download_price_batch(tuple(tickers) + ("^NSEI",), global_start, global_end, failed=failed)
+    market_df = batch.get("^NSEI", pd.DataFrame(columns=["High", "Low", "Close"]))
+
+    priced = [t for t in tickers if batch.get(t) is not None and not batch[t].empty]
+    dividends, _ = fetch_many(fetch_dividends, priced, default=pd.Series(dtype=float))
 
     for t in tickers:
-        ser = download_price_series(t, global_start, global_end)
+        ser = batch.get(t)
         if ser is None or ser.empty:
             missing.append(t)
             price_dict[t] = pd.Series(dtype=float, name=t)
@@ -156,8 +232,7 @@ def fetch_all_data(tickers: list, date_ranges: Dict[str, Tuple[pd.Timestamp, pd.
             continue
 
         price_dict[t] = ser
-        div = fetch_dividends(t)
-        div_dict[t] = div
+        div_dict[t] = dividends.get(t)
 
         if t in date_ranges:
             s_dt = pd.to_datetime(date_ranges[t][0])
@@ -167,11 +242,7 @@ def fetch_all_data(tickers: list, date_ranges: Dict[str, Tuple[pd.Timestamp, pd.
         idx, p = first_price_after(ser["Close"], s_dt)
         buy_date_actual[t] = idx
         buy_price[t] = p
-        live = live_price(t)
-        if live is not None:
-            latest_price[t] = live
-        else:
-            latest_price[t] = float(ser["Close"].iloc[-1] if (ser is not None and not ser.empty) else None)
+        latest_price[t] = float(ser["Close"].iloc[-1])
 
     available_close = [df["Close"].rename(t) for t, df in price_dict.items() if not df.empty]
     if available_close:
@@ -188,7 +259,8 @@ def fetch_all_data(tickers: list, date_ranges: Dict[str, Tuple[pd.Timestamp, pd.
             "buy_date_actual": buy_date_actual,
             "latest_price": latest_price,
             "market_df": market_df, 
-            "missing": missing}
+            "missing": missing,
+            "failed": [t for t in dict.fromkeys(failed) if t in missing or t == "^NSEI"]}
 
 
 
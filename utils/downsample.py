@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+MAX_POINTS_PER_TRACE = 1000
+
+
+def minmax_indices(y, max_points: int = MAX_POINTS_PER_TRACE) -> np.ndarray:
+    """Positions to keep so each bucket retains its first, last, min and max point (M4 bucketing)."""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if max_points is None or n <= max_points:
+        return np.arange(n)
+
+    buckets = max(1, max_points // 4)
+    edges = np.linspace(0, n, buckets + 1).astype(int)
+    starts, stops = edges[:-1], edges[1:]
+    idx = starts[:, None] + np.arange(int((stops - starts).max()))
+    valid = idx < stops[:, None]
+    idx = np.minimum(idx, n - 1)
+    values = y[idx]
+    rows = np.arange(buckets)
+    lows = idx[rows, np.where(valid, values, np.inf).argmin(axis=1)]
+    highs = idx[rows, np.where(valid, values, -np.inf).argmax(axis=1)]
+    return np.unique(np.r_[starts, stops - 1, lows, highs])
+
+
+def downsample_frame(df: pd.DataFrame, y: str, color: str = None, max_points: int = MAX_POINTS_PER_TRACE) -> pd.DataFrame:
+    if max_points is None or df.empty:
+        return df
+    groups = df.groupby(color, sort=False).indices.values() if color else [np.arange(len(df))]
+    values = df[y].to_numpy(dtype=float)
+    keep = []
+    for positions in groups:
+        if len(positions) <= max_points:
+            keep.append(positions)
+            continue
+        positions = positions[~np.isnan(values[positions])]
+        keep.append(positions[minmax_indices(values[positions], max_points)])
+    return df.iloc[np.sort(np.concatenate(keep))].reset_index(drop=True) if keep else df
+
+
+def downsample_series(x, y, max_points: int = MAX_POINTS_PER_TRACE):
+    x, y = np.asarray(x), np.asarray(y, dtype=float)
+    if max_points is None or len(y) <= max_points:
+        return x, y
+    present = ~np.isnan(y)
+    x, y = x[present], y[present]
+    keep = minmax_indices(y, max_points)
+    return x[keep], y[keep]
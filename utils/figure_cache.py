@@ -0,0 +1,108 @@
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def _feed(h, obj):
+    if isinstance(obj, pd.DataFrame):
+        h.update(b"df")
+        h.update(repr((list(obj.columns), [str(t) for t in obj.dtypes])).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, (pd.Series, pd.Index)):
+        h.update(b"series" if isinstance(obj, pd.Series) else b"index")
+        h.update(repr((getattr(obj, "name", None), str(obj.dtype))).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=isinstance(obj, pd.Series)).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(repr((obj.shape, str(obj.dtype))).encode())
+        if obj.dtype == object:
+            _feed(h, pd.Series(obj.ravel()))
+        else:
+            h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"(" if isinstance(obj, tuple) else b"[")
+        for item in obj:
+            _feed(h, item)
+        h.update(b")")
+    elif isinstance(obj, dict):
+        h.update(b"{")
+        for k, v in sorted(obj.items(), key=lambda kv: repr(kv[0])):
+            _feed(h, k)
+            _feed(h, v)
+        h.update(b"}")
+    elif obj is None or isinstance(obj, (str, bytes, bool, int, float, np.generic, pd.Timestamp)):
+        h.update(repr((type(obj).__name__, obj)).encode())
+    else:
+        raise TypeError(f"cannot fingerprint {type(obj).__name__}")
+
+
+def fingerprint(*args, **kwargs) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    _feed(h, args)
+    _feed(h, kwargs)
+    return h.hexdigest()
+
+
+class FigureCache:
+    """Byte-bounded LRU of serialized figure specs, keyed by a content hash of the chart inputs."""
+
+    def __init__(self, max_bytes: int = MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+        return go.Figure(entry[0], _validate=False)
+
+    def put(self, key, fig: go.Figure):
+        spec = fig.to_dict()
+        size = len(pio.to_json(spec, validate=False))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (spec, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                self.nbytes -= self._entries.popitem(last=False)[1][1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+FIGURE_CACHE = FigureCache()
+
+
+def cached_figure(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            key = (func.__qualname__, fingerprint(*args, **kwargs))
+        except TypeError:
+            return func(*args, **kwargs)
+        fig = FIGURE_CACHE.get(key)
+        if fig is None:
+            fig = func(*args, **kwargs)
+            FIGURE_CACHE.put(key, fig)
+            fig = FIGURE_CACHE.get(key) or fig
+        return fig
+    return wrapper
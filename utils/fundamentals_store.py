@@ -0,0 +1,78 @@
+import os
+import pickle
+import sqlite3
+from contextlib import closing
+import pandas as pd
+from typing import Optional
+
+STORE_PATH = os.getenv("FUNDAMENTALS_STORE", os.path.join(".cache", "fundamentals.sqlite"))
+REPORTING_LAG = pd.Timedelta(days=60)
+RETRY_AFTER = pd.Timedelta(days=1)
+MAX_AGE = pd.Timedelta(days=120)
+
+
+def _connect() -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(STORE_PATH) or ".", exist_ok=True)
+    conn = sqlite3.connect(STORE_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""CREATE TABLE IF NOT EXISTS statements (
+                        ticker TEXT NOT NULL,
+                        statement TEXT NOT NULL,
+                        payload BLOB NOT NULL,
+                        fetched_at TEXT NOT NULL,
+                        expires_at TEXT NOT NULL,
+                        PRIMARY KEY (ticker, statement))""")
+    return conn
+
+
+def _latest_period(data: dict) -> Optional[pd.Timestamp]:
+    periods = []
+    for key in ("income_q", "income", "balance", "cashbflow"):
+        frame = data.get(key)
+        if isinstance(frame, pd.DataFrame) and not frame.empty:
+            try:
+                periods.append(pd.to_datetime(frame.columns).max())
+            except Exception:
+                continue
+    periods = [p.tz_localize(None) if p.tzinfo else p for p in periods if pd.notna(p)]
+    return max(periods) if periods else None
+
+
+def next_report_expiry(data: dict, now: pd.Timestamp = None) -> pd.Timestamp:
+    now = now if now is not None else pd.Timestamp.now()
+    latest = _latest_period(data)
+    if latest is None:
+        return now + RETRY_AFTER
+    expected = latest + pd.offsets.QuarterEnd(1) + REPORTING_LAG
+    if expected <= now:
+        return now + RETRY_AFTER
+    return min(expected, now + MAX_AGE)
+
+
+def load_fundamentals(ticker: str) -> Optional[dict]:
+    try:
+        with closing(_connect()) as conn:
+            rows = conn.execute("SELECT statement, payload, expires_at FROM statements WHERE ticker = ?", (ticker,)).fetchall()
+    except sqlite3.Error:
+        return None
+    if not rows:
+        return None
+    now = pd.Timestamp.now()
+    if any(pd.Timestamp(expires_at) <= now for _, _, expires_at in rows):
+        return None
+    return {statement: pickle.loads(payload) for statement, payload, _ in rows}
+
+
+def save_fundamentals(ticker: str, data: dict):
+    if not data:
+        return
+    now = pd.Timestamp.now()
+    expires_at = next_report_expiry(data, now).isoformat()
+    rows = [(ticker, statement, pickle.dumps(value), now.isoformat(), expires_at)
+            for statement, value in data.items() if value is not None]
+    try:
+        with closing(_connect()) as conn, conn:
+            conn.execute("DELETE FROM statements WHERE ticker = ?", (ticker,))
+            conn.executemany("INSERT INTO statements VALUES (?, ?, ?, ?, ?)", rows)
+    except sqlite3.Error:
+        pass
@@ -0,0 +1,335 @@
+import numpy as np
+import pandas as pd
+from collections import deque
+
+PERIOD = 14
+EMA_SPAN = 20
+SMA_WINDOW = 50
+MOMENTUM_WINDOW = 20
+YEAR_WINDOW = 252
+
+
+def _ratio(num: float, den: float) -> float:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return float(np.float64(num) / np.float64(den))
+
+
+class EMA:
+    """Exponential average with pandas `ewm(alpha, adjust=False)` semantics, including NaN gaps."""
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.value = np.nan
+        self._decay = 1.0
+
+    @classmethod
+    def span(cls, span: int) -> "EMA":
+        return cls(2 / (span + 1))
+
+    def _step(self, x: float):
+        if np.isnan(self.value):
+            return (float(x), 1.0) if not np.isnan(x) else (np.nan, 1.0)
+        decay = self._decay * (1 - self.alpha)
+        if np.isnan(x):
+            return self.value, decay
+        return (decay * self.value + self.alpha * x) / (decay + self.alpha), 1.0
+
+    def seed(self, values) -> "EMA":
+        values = np.asarray(values, dtype=float)
+        observed = np.flatnonzero(~np.isnan(values))
+        if observed.size == 0:
+            return self
+        self.value = float(pd.Series(values).ewm(alpha=self.alpha, adjust=False).mean().iloc[-1])
+        self._decay = (1 - self.alpha) ** (len(values) - 1 - observed[-1])
+        return self
+
+    def update(self, x: float) -> float:
+        self.value, self._decay = self._step(x)
+        return self.value
+
+    def peek(self, x: float) -> float:
+        return self._step(x)[0]
+
+
+class RollingSMA:
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self._since_resum = 0
+
+    def seed(self, values) -> "RollingSMA":
+        self.values.extend(np.asarray(values, dtype=float)[-self.window:].tolist())
+        self.total = float(sum(self.values))
+        return self
+
+    @property
+    def value(self) -> float:
+        return self.total / self.window if len(self.values) == self.window else np.nan
+
+    def update(self, x: float) -> float:
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(x)
+        self.total += x
+        self._since_resum += 1
+        if self._since_resum >= self.window:
+            self.total = float(sum(self.values))
+            self._since_resum = 0
+        return self.value
+
+    def peek(self, x: float) -> float:
+        if len(self.values) + 1 < self.window:
+            return np.nan
+        dropped = self.values[0] if len(self.values) == self.window else 0.0
+        return (self.total - dropped + x) / self.window
+
+
+class RollingExtrema:
+    """Rolling max and min over the last `window` values using monotonic deques."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.count = 0
+        self._max = deque()
+        self._min = deque()
+
+    def seed(self, values) -> "RollingExtrema":
+        values = np.asarray(values, dtype=float)
+        self.count = len(values) - min(len(values), self.window)
+        for x in values[-self.window:]:
+            self.update(x)
+        return self
+
+    @property
+    def max(self) -> float:
+        return self._max[0][1] if self.count >= self.window else np.nan
+
+    @property
+    def min(self) -> float:
+        return self._min[0][1] if self.count >= self.window else np.nan
+
+    def update(self, x: float):
+        i = self.count
+        while self._max and self._max[-1][1] <= x:
+            self._max.pop()
+        while self._min and self._min[-1][1] >= x:
+            self._min.pop()
+        self._max.append((i, x))
+        self._min.append((i, x))
+        while self._max[0][0] <= i - self.window:
+            self._max.popleft()
+        while self._min[0][0] <= i - self.window:
+            self._min.popleft()
+        self.count += 1
+        return self.max, self.min
+
+    def _survivor(self, dq: deque):
+        for idx, v in list(dq)[:2]:
+            if idx > self.count - self.window:
+                return v
+        return None
+
+    def peek(self, x: float):
+        if self.count + 1 < self.window:
+            return np.nan, np.nan
+        hi = self._survivor(self._max)
+        lo = self._survivor(self._min)
+        return (x if hi is None else max(hi, x)), (x if lo is None else min(lo, x))
+
+
+class WilderRSI:
+    def __init__(self, period: int = PERIOD):
+        self.period = period
+        self.gain = EMA(1 / period)
+        self.loss = EMA(1 / period)
+        self.prev_close = np.nan
+        self.count = 0
+
+    def seed(self, closes) -> "WilderRSI":
+        closes = np.asarray(closes, dtype=float)
+        if len(closes) == 0:
+            return self
+        delta = np.diff(closes)
+        self.gain.seed(np.clip(delta, 0, None))
+        self.loss.seed(-np.clip(delta, None, 0))
+        self.prev_close = float(closes[-1])
+        self.count = len(closes)
+        return self
+
+    def _rsi(self, gain: float, loss: float, count: int) -> float:
+        if count < self.period + 1:
+            return np.nan
+        return 100 - 100 / (1 + _ratio(gain, loss))
+
+    @property
+    def value(self) -> float:
+        return self._rsi(self.gain.value, self.loss.value, self.count)
+
+    def update(self, close: float) -> float:
+        if self.count:
+            delta = close - self.prev_close
+            self.gain.update(max(delta, 0.0))
+            self.loss.update(max(-delta, 0.0))
+        self.prev_close = close
+        self.count += 1
+        return self.value
+
+    def peek(self, close: float) -> float:
+        if not self.count:
+            return np.nan
+        delta = close - self.prev_close
+        return self._rsi(self.gain.peek(max(delta, 0.0)), self.loss.peek(max(-delta, 0.0)), self.count + 1)
+
+
+class WilderADX:
+    def __init__(self, period: int = PERIOD):
+        self.period = period
+        self.atr = EMA(1 / period)
+        self.plus_dm = EMA(1 / period)
+        self.minus_dm = EMA(1 / period)
+        self.adx = EMA(1 / period)
+        self.prev = None
+        self.count = 0
+
+    @staticmethod
+    def _moves(high, low, prev_high, prev_low, prev_close):
+        up_move = high - prev_high
+        down_move = prev_low - low
+        with np.errstate(invalid="ignore"):
+            plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+            minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+        tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        return tr, plus_dm, minus_dm
+
+    @staticmethod
+    def _dx(atr, plus_dm, minus_dm):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            plus_di = 100 * (plus_dm / atr)
+            minus_di = 100 * (minus_dm / atr)
+            return 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+
+    def seed(self, high, low, close) -> "WilderADX":
+        high, low, close = (np.asarray(v, dtype=float) for v in (high, low, close))
+        if len(close) == 0:
+            return self
+        prev = lambda v: np.r_[np.nan, v[:-1]]
+        tr, plus_dm, minus_dm = self._moves(high, low, prev(high), prev(low), prev(close))
+        alpha = 1 / self.period
+        smooth = lambda v: pd.Series(v).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+        dx = self._dx(smooth(tr), smooth(plus_dm), smooth(minus_dm))
+        self.atr.seed(tr)
+        self.plus_dm.seed(plus_dm)
+        self.minus_dm.seed(minus_dm)
+        self.adx.seed(dx)
+        self.prev = (float(high[-1]), float(low[-1]), float(close[-1]))
+        self.count = len(close)
+        return self
+
+    def _bar(self, high, low, close):
+        prev_high, prev_low, prev_close = self.prev if self.prev else (np.nan, np.nan, np.nan)
+        tr, plus_dm, minus_dm = self._moves(high, low, prev_high, prev_low, prev_close)
+        return float(tr), float(plus_dm), float(minus_dm)
+
+    @property
+    def value(self) -> float:
+        return self.adx.value if self.count >= self.period + 1 else np.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        tr, plus_dm, minus_dm = self._bar(high, low, close)
+        dx = self._dx(self.atr.update(tr), self.plus_dm.update(plus_dm), self.minus_dm.update(minus_dm))
+        self.adx.update(float(dx))
+        self.prev = (high, low, close)
+        self.count += 1
+        return self.value
+
+    def peek(self, high: float, low: float, close: float) -> float:
+        if self.count + 1 < self.period + 1:
+            return np.nan
+        tr, plus_dm, minus_dm = self._bar(high, low, close)
+        dx = self._dx(self.atr.peek(tr), self.plus_dm.peek(plus_dm), self.minus_dm.peek(minus_dm))
+        return self.adx.peek(float(dx))
+
+
+class IndicatorState:
+    """Per-ticker indicator set seeded once from history. `update` commits a finished bar, `tick` sets the
+    provisional in-progress bar; both are O(1) and `snapshot` reflects whichever is current."""
+
+    def __init__(self):
+        self.rsi = WilderRSI()
+        self.adx = WilderADX()
+        self.ema20 = EMA.span(EMA_SPAN)
+        self.ema20_prev = np.nan
+        self.sma50 = RollingSMA(SMA_WINDOW)
+        self.high_52w = RollingExtrema(YEAR_WINDOW)
+        self.low_52w = RollingExtrema(YEAR_WINDOW)
+        self.closes = deque(maxlen=MOMENTUM_WINDOW)
+        self.count = 0
+        self._live = None
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame) -> "IndicatorState":
+        state = cls()
+        if df is None or df.empty:
+            return state
+        df = df[["High", "Low", "Close"]].astype(float).dropna()
+        if df.empty:
+            return state
+        high, low, close = (df[c].to_numpy() for c in ("High", "Low", "Close"))
+        state.rsi.seed(close)
+        state.adx.seed(high, low, close)
+        state.ema20.seed(close[:-1])
+        state.ema20_prev = state.ema20.value
+        state.ema20.update(close[-1])
+        state.sma50.seed(close)
+        state.high_52w.seed(high)
+        state.low_52w.seed(low)
+        state.closes.extend(close[-MOMENTUM_WINDOW:].tolist())
+        state.count = len(close)
+        return state
+
+    def update(self, high: float, low: float, close: float):
+        self.rsi.update(close)
+        self.adx.update(high, low, close)
+        self.ema20_prev = self.ema20.value
+        self.ema20.update(close)
+        self.sma50.update(close)
+        self.high_52w.update(high)
+        self.low_52w.update(low)
+        self.closes.append(close)
+        self.count += 1
+        self._live = None
+
+    def tick(self, high: float, low: float, close: float):
+        self._live = self._peek(float(high), float(low), float(close))
+
+    def _momentum(self, last: float, prev20: float, count: int) -> float:
+        return (last - prev20) / prev20 if count > MOMENTUM_WINDOW and prev20 else np.nan
+
+    def _committed(self) -> dict:
+        return {"Last": self.closes[-1] if self.closes else np.nan,
+                "RSI": self.rsi.value,
+                "ADX": self.adx.value,
+                "EMA20": self.ema20.value,
+                "EMA20 Slope": self.ema20.value - self.ema20_prev if self.count > 1 else np.nan,
+                "SMA50": self.sma50.value,
+                "20D Momentum %": self._momentum(self.closes[-1], self.closes[0], self.count) if self.closes else np.nan,
+                "52W High": self.high_52w.max,
+                "52W Low": self.low_52w.min}
+
+    def _peek(self, high: float, low: float, close: float) -> dict:
+        ema20 = self.ema20.peek(close)
+        full = len(self.closes) == MOMENTUM_WINDOW
+        prev20 = self.closes[1] if full else (self.closes[0] if self.closes else close)
+        return {"Last": close,
+                "RSI": self.rsi.peek(close),
+                "ADX": self.adx.peek(high, low, close),
+                "EMA20": ema20,
+                "EMA20 Slope": ema20 - self.ema20.value if self.count else np.nan,
+                "SMA50": self.sma50.peek(close),
+                "20D Momentum %": self._momentum(close, prev20, self.count + 1),
+                "52W High": self.high_52w.peek(high)[0],
+                "52W Low": self.low_52w.peek(low)[1]}
+
+    def snapshot(self) -> dict:
+        return dict(self._live) if self._live is not None else self._committed()
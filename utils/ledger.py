@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+from typing import Dict
+
+LEDGER_COLUMNS = ["Ticker", "Date", "Quantity", "Price"]
+_ALIASES = {"ticker": "Ticker", "symbol": "Ticker",
+            "date": "Date", "trade date": "Date",
+            "qty": "Quantity", "quantity": "Quantity", "shares": "Quantity",
+            "price": "Price", "trade price": "Price",
+            "side": "Side", "type": "Side"}
+
+
+def _empty() -> pd.DataFrame:
+    return pd.DataFrame({"Ticker": pd.Series(dtype=str),
+                         "Date": pd.Series(dtype="datetime64[ns]"),
+                         "Quantity": pd.Series(dtype=float),
+                         "Price": pd.Series(dtype=float)})
+
+
+def read_transactions(source) -> pd.DataFrame:
+    raw = pd.read_csv(source)
+    raw = raw.rename(columns={c: _ALIASES.get(str(c).strip().lower(), c) for c in raw.columns})
+    missing = [c for c in LEDGER_COLUMNS if c not in raw.columns]
+    if missing:
+        raise ValueError(f"transactions file is missing column(s): {', '.join(missing)}")
+    df = raw[LEDGER_COLUMNS].copy()
+    df["Ticker"] = df["Ticker"].astype(str).str.strip()
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    df["Quantity"] = pd.to_numeric(df["Quantity"], errors="coerce")
+    df["Price"] = pd.to_numeric(df["Price"], errors="coerce")
+    if "Side" in raw.columns:
+        sells = raw["Side"].astype(str).str.strip().str.lower().isin(["sell", "s"])
+        df.loc[sells, "Quantity"] = -df.loc[sells, "Quantity"].abs()
+    return df.dropna().reset_index(drop=True)
+
+
+class Ledger:
+    """Columnar lot ledger: one row per transaction, positive quantities buy and negative quantities sell."""
+
+    def __init__(self, transactions: pd.DataFrame = None):
+        df = transactions if transactions is not None else _empty()
+        df = df[LEDGER_COLUMNS].sort_values("Date", kind="stable").reset_index(drop=True)
+        self.tickers = df["Ticker"].to_numpy(dtype=object)
+        self.dates = pd.DatetimeIndex(df["Date"]).normalize().to_numpy()
+        self.quantity = df["Quantity"].to_numpy(dtype=float)
+        self.price = df["Price"].to_numpy(dtype=float)
+
+    def __len__(self) -> int:
+        return len(self.quantity)
+
+    @classmethod
+    def from_holdings(cls, shares: dict, buy_price: dict, buy_date_actual: dict, date_ranges: dict = None,
+                      closes: pd.DataFrame = None) -> "Ledger":
+        rows = []
+        for t, qty in shares.items():
+            if not qty or buy_price.get(t) is None or buy_date_actual.get(t) is None:
+                continue
+            rows.append((t, pd.Timestamp(buy_date_actual[t]), float(qty), float(buy_price[t])))
+            if date_ranges and closes is not None and t in closes.columns and t in date_ranges:
+                end = pd.Timestamp(date_ranges[t][1]).normalize()
+                after = closes[t].loc[closes.index > end].dropna()
+                held = closes[t].loc[closes.index <= end].dropna()
+                if not after.empty and not held.empty:
+                    rows.append((t, after.index[0], -float(qty), float(held.iloc[-1])))
+        return cls(pd.DataFrame(rows, columns=LEDGER_COLUMNS) if rows else None)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({"Ticker": self.tickers, "Date": self.dates, "Quantity": self.quantity, "Price": self.price})
+
+    def replace_tickers(self, other: "Ledger") -> "Ledger":
+        keep = ~np.isin(self.tickers, np.unique(other.tickers))
+        return Ledger(pd.concat([self.to_frame().loc[keep], other.to_frame()], ignore_index=True))
+
+    def fingerprint(self) -> int:
+        return hash((tuple(self.tickers.tolist()), self.dates.tobytes(), self.quantity.tobytes(), self.price.tobytes()))
+
+    def daily_grid(self, index: pd.DatetimeIndex, columns: pd.Index, values: np.ndarray) -> np.ndarray:
+        grid = np.zeros((len(index), len(columns)))
+        cols = columns.get_indexer(self.tickers)
+        rows = index.searchsorted(self.dates, side="left")
+        keep = (cols >= 0) & (rows < len(index))
+        np.add.at(grid, (rows[keep], cols[keep]), values[keep])
+        return grid
+
+    def positions(self, index: pd.DatetimeIndex, columns) -> pd.DataFrame:
+        columns = pd.Index(columns)
+        return pd.DataFrame(np.cumsum(self.daily_grid(index, columns, self.quantity), axis=0), index=index, columns=columns)
+
+    def current_positions(self) -> Dict[str, float]:
+        return pd.Series(self.quantity, index=self.tickers).groupby(level=0).sum().to_dict() if len(self) else {}
+
+    def average_cost(self) -> Dict[str, float]:
+        buys = self.quantity > 0
+        if not buys.any():
+            return {}
+        frame = pd.DataFrame({"cost": self.quantity[buys] * self.price[buys], "qty": self.quantity[buys]}, index=self.tickers[buys])
+        totals = frame.groupby(level=0).sum()
+        return (totals["cost"] / totals["qty"]).to_dict()
+
+    def open_cost_changes(self) -> np.ndarray:
+        """Change in each ticker's open cost basis per transaction: buys add their cost, sells release the average cost."""
+        changes = np.zeros(len(self))
+        held = {}
+        for i, (t, q, p) in enumerate(zip(self.tickers, self.quantity, self.price)):
+            qty, cost = held.get(t, (0.0, 0.0))
+            if q > 0:
+                changes[i] = q * p
+            elif qty > 0:
+                changes[i] = -cost * min(-q, qty) / qty
+            held[t] = (qty + q, cost + changes[i])
+        return changes
+
+    def first_dates(self) -> Dict[str, pd.Timestamp]:
+        if not len(self):
+            return {}
+        return pd.Series(self.dates, index=self.tickers).groupby(level=0).min().to_dict()
+
+
+def position_history(ledger: Ledger, prices: pd.DataFrame) -> dict:
+    index, columns = prices.index, prices.columns
+    flows = ledger.daily_grid(index, columns, ledger.quantity * ledger.price)
+    qty = ledger.positions(index, columns).to_numpy()
+    px = np.nan_to_num(prices.to_numpy(dtype=float))
+
+    holding_value = qty * px
+    holding_cost = np.cumsum(ledger.daily_grid(index, columns, ledger.open_cost_changes()), axis=0)
+    value = holding_value.sum(axis=1)
+    invested = np.cumsum(flows, axis=0).sum(axis=1)
+    daily_flow = flows.sum(axis=1)
+
+    prev_value = np.r_[np.nan, value[:-1]]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        twr = np.where(prev_value > 0, (value - daily_flow) / prev_value - 1, np.nan)
+    active = value > 0
+    growth = pd.Series(np.where(active, 1 + np.nan_to_num(twr), np.nan), index=index)
+    wealth = growth.cumprod() if active.any() else growth
+
+    return {"positions": pd.DataFrame(qty, index=index, columns=columns),
+            "value": pd.Series(value, index=index),
+            "invested": pd.Series(invested, index=index),
+            "total_pnl": pd.Series(value - invested, index=index),
+            "pnl": pd.Series(value - holding_cost.sum(axis=1), index=index),
+            "holding_pnl": pd.DataFrame(holding_value - holding_cost, index=index, columns=columns),
+            "flows": pd.Series(daily_flow, index=index),
+            "twr": pd.Series(twr, index=index),
+            "wealth": wealth.loc[active]}
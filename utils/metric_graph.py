@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Tuple
+from utils.helper import safe_float
+from utils.analytics import compute_stock_risk_metrics, rolling_analytics
+from utils.correlation import correlation_matrix, cluster_order, top_pairs
+
+NODES: Dict[str, Tuple[Callable, Tuple[str, ...]]] = {}
+
+
+def node(name: str, *deps: str):
+    def register(func: Callable) -> Callable:
+        NODES[name] = (func, deps)
+        return func
+    return register
+
+
+class MetricGraph:
+    """Lazily evaluated artifacts for one version of the data bundle. Each node is computed on first access
+    from its dependencies and memoized, so tabs share a single computation per artifact."""
+
+    def __init__(self, version, **inputs):
+        self.version = version
+        self._values = dict(inputs)
+        self._computing = set()
+
+    def __getitem__(self, name: str):
+        if name in self._values:
+            return self._values[name]
+        if name not in NODES:
+            raise KeyError(name)
+        if name in self._computing:
+            raise RuntimeError(f"metric graph cycle at {name}")
+        func, deps = NODES[name]
+        self._computing.add(name)
+        try:
+            value = func(*(self[d] for d in deps))
+        finally:
+            self._computing.discard(name)
+        self._values[name] = value
+        return value
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._values
+
+    def memo(self, key, func: Callable, *args, **kwargs):
+        if key not in self._values:
+            self._values[key] = func(*args, **kwargs)
+        return self._values[key]
+
+
+@node("prices", "price_df", "valid_tickers")
+def _prices(price_df, valid_tickers):
+    return price_df[valid_tickers].astype(float) if not price_df.empty else pd.DataFrame(columns=valid_tickers)
+
+
+@node("returns", "prices")
+def _returns(prices):
+    return prices.pct_change().iloc[1:]
+
+
+@node("log_returns", "prices")
+def _log_returns(prices):
+    return np.log(prices / prices.shift(1)).iloc[1:]
+
+
+@node("covariance", "log_returns")
+def _covariance(log_returns):
+    return log_returns.dropna().cov()
+
+
+@node("correlation", "log_returns")
+def _correlation(log_returns):
+    return correlation_matrix(log_returns)
+
+
+@node("correlation_order", "correlation")
+def _correlation_order(correlation):
+    return cluster_order(correlation)
+
+
+@node("correlation_pairs", "correlation")
+def _correlation_pairs(correlation):
+    return top_pairs(correlation, k=10)
+
+
+@node("drawdown", "pf_returns")
+def _drawdown(pf_returns):
+    return pf_returns.to_drawdown_series() if not pf_returns.empty else pd.Series(dtype=float)
+
+
+@node("share_values", "valid_tickers", "latest_price", "shares")
+def _share_values(valid_tickers, latest_price, shares):
+    return {t: safe_float(latest_price.get(t)) * float(shares.get(t, 0)) for t in valid_tickers}
+
+
+@node("total_value", "share_values")
+def _total_value(share_values):
+    return float(sum(share_values.values())) if share_values else 0.0
+
+
+@node("weights", "share_values", "total_value")
+def _weights(share_values, total_value):
+    return {t: (v / total_value if total_value > 0 else 0.0) for t, v in share_values.items()}
+
+
+@node("stock_risk", "prices", "market_df", "log_returns")
+def _stock_risk(prices, market_df, log_returns):
+    return compute_stock_risk_metrics(prices, market_df, log_returns=log_returns)
+
+
+@node("market_log_returns", "market_df")
+def _market_log_returns(market_df):
+    if market_df is None or market_df.empty:
+        return pd.Series(dtype=float)
+    close = market_df["Close"].astype(float)
+    return np.log(close / close.shift(1)).iloc[1:]
+
+
+@node("rolling", "log_returns", "pf_log_returns", "market_log_returns")
+def _rolling(log_returns, pf_log_returns, market_log_returns):
+    panel = log_returns.copy()
+    panel["Portfolio"] = pf_log_returns.reindex(panel.index) if not pf_log_returns.empty else np.nan
+    return rolling_analytics(panel, market_log_returns)
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+
+TRADING_DAYS = 252
+FRONTIER_POINTS = 25
+
+
+def _bounds(n: int, cap: float):
+    cap = max(float(cap), 1.0 / n)
+    return [(0.0, cap)] * n, cap
+
+
+def _budget():
+    return {"type": "eq", "fun": lambda w: w.sum() - 1.0, "jac": lambda w: np.ones_like(w)}
+
+
+def _solve(objective, x0, bounds, constraints, jac=None):
+    res = minimize(objective, x0, jac=jac, method="SLSQP", bounds=bounds, constraints=constraints, options={"maxiter": 500, "ftol": 1e-10})
+    w = np.clip(res.x, 0.0, None)
+    return w / w.sum()
+
+
+def _feasible_start(n: int, cap: float) -> np.ndarray:
+    return np.full(n, 1.0 / n) if cap >= 1.0 / n else np.full(n, cap)
+
+
+def min_variance(cov: np.ndarray, cap: float = 1.0, x0: np.ndarray = None) -> np.ndarray:
+    bounds, cap = _bounds(len(cov), cap)
+    x0 = x0 if x0 is not None else _feasible_start(len(cov), cap)
+    return _solve(lambda w: w @ cov @ w, x0, bounds, [_budget()], jac=lambda w: 2 * cov @ w)
+
+
+def max_sharpe(mu: np.ndarray, cov: np.ndarray, risk_free_rate: float = 0.0, cap: float = 1.0, x0: np.ndarray = None) -> np.ndarray:
+    bounds, cap = _bounds(len(cov), cap)
+    x0 = x0 if x0 is not None else _feasible_start(len(cov), cap)
+    excess = mu - risk_free_rate
+
+    def objective(w):
+        return -(w @ excess) / np.sqrt(w @ cov @ w)
+
+    def gradient(w):
+        var = w @ cov @ w
+        vol = np.sqrt(var)
+        return -(excess * vol - (w @ excess) * (cov @ w) / vol) / var
+
+    return _solve(objective, x0, bounds, [_budget()], jac=gradient)
+
+
+def risk_parity(cov: np.ndarray, cap: float = 1.0) -> np.ndarray:
+    n = len(cov)
+    bounds, cap = _bounds(n, cap)
+    inv_vol = 1 / np.sqrt(np.clip(np.diag(cov), 1e-12, None))
+    x0 = np.minimum(inv_vol / inv_vol.sum(), cap)
+    x0 = x0 / x0.sum()
+
+    def objective(w):
+        marginal = cov @ w
+        contrib = w * marginal / (w @ marginal)
+        return np.sum((contrib - 1.0 / n) ** 2) * n
+
+    def gradient(w):
+        marginal = cov @ w
+        var = w @ marginal
+        err = w * marginal / var - 1.0 / n
+        return 2 * n * (err * marginal / var + cov @ (err * w) / var - 2 * marginal * (err @ (w * marginal)) / var ** 2)
+
+    return _solve(objective, x0, bounds, [_budget()], jac=gradient)
+
+
+def _max_return(mu: np.ndarray, cap: float) -> float:
+    remaining, total = 1.0, 0.0
+    for r in np.sort(mu)[::-1]:
+        take = min(cap, remaining)
+        total += take * r
+        remaining -= take
+        if remaining <= 0:
+            break
+    return total
+
+
+def efficient_frontier(mu: np.ndarray, cov: np.ndarray, cap: float = 1.0, n_points: int = FRONTIER_POINTS, start: np.ndarray = None):
+    bounds, cap = _bounds(len(cov), cap)
+    w_min = start if start is not None else min_variance(cov, cap)
+    targets = np.linspace(w_min @ mu, _max_return(mu, cap), n_points)
+
+    weights = []
+    w = w_min
+    for target in targets:
+        constraints = [_budget(), {"type": "eq", "fun": lambda w, t=target: w @ mu - t, "jac": lambda w: mu}]
+        w = _solve(lambda w: w @ cov @ w, w, bounds, constraints, jac=lambda w: 2 * cov @ w)
+        weights.append(w)
+    return np.array(weights)
+
+
+def _stats(w: np.ndarray, mu: np.ndarray, cov: np.ndarray, risk_free_rate: float):
+    ret = float(w @ mu)
+    vol = float(np.sqrt(w @ cov @ w))
+    return ret, vol, (ret - risk_free_rate) / vol if vol else np.nan
+
+
+def optimize_portfolio(log_returns: pd.DataFrame, covariance: pd.DataFrame, current_weights: dict, cap: float = 1.0,
+                       risk_free_rate: float = 0.0526, n_points: int = FRONTIER_POINTS) -> dict:
+    tickers = [t for t in covariance.columns if covariance[t].notna().all()]
+    if len(tickers) < 2:
+        return {"frontier": pd.DataFrame(), "portfolios": pd.DataFrame(), "weights": pd.DataFrame()}
+
+    mu = log_returns.dropna()[tickers].mean().to_numpy() * TRADING_DAYS
+    cov = covariance.loc[tickers, tickers].to_numpy(dtype=float) * TRADING_DAYS
+
+    w_min = min_variance(cov, cap)
+    frontier_w = efficient_frontier(mu, cov, cap, n_points, start=w_min)
+    sharpe_start = frontier_w[np.nanargmax([_stats(w, mu, cov, risk_free_rate)[2] for w in frontier_w])]
+    portfolios = {"Current": np.array([current_weights.get(t, 0.0) for t in tickers]),
+                  "Min Variance": w_min,
+                  "Max Sharpe": max_sharpe(mu, cov, risk_free_rate, cap, x0=sharpe_start),
+                  "Risk Parity": risk_parity(cov, cap)}
+    if portfolios["Current"].sum() > 0:
+        portfolios["Current"] = portfolios["Current"] / portfolios["Current"].sum()
+
+    frontier = pd.DataFrame([_stats(w, mu, cov, risk_free_rate) for w in frontier_w], columns=["Return", "Volatility", "Sharpe"])
+    summary = pd.DataFrame([(name, *_stats(w, mu, cov, risk_free_rate)) for name, w in portfolios.items()],
+                           columns=["Portfolio", "Return", "Volatility", "Sharpe"])
+    weights = pd.DataFrame(portfolios, index=tickers)
+    weights.index.name = "Ticker"
+    return {"frontier": frontier, "portfolios": summary, "weights": weights}
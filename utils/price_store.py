@@ -0,0 +1,210 @@
+import os
+import json
+import re
+import tempfile
+import threading
+from contextlib import ExitStack
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from typing import Callable, Dict, List, Optional, Tuple
+from utils.resilience import FetchError
+
+STORE_DIR = os.getenv("PRICE_STORE_DIR", os.path.join(".cache", "prices"))
+TAIL_REFRESH = pd.Timedelta(minutes=15)
+OVERLAP_BARS = 5
+OVERLAP_RTOL = 1e-3
+COLUMNS = ["High", "Low", "Close"]
+_META_KEY = b"price_store"
+
+_MEMORY = {}
+_MEMORY_LOCK = threading.Lock()
+_TICKER_LOCKS = {}
+
+
+def _empty_frame() -> pd.DataFrame:
+    return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([]), dtype=float)
+
+
+def _path(ticker: str) -> str:
+    name = re.sub(r"[^A-Za-z0-9._-]", "_", ticker)
+    return os.path.join(STORE_DIR, f"{name}.parquet")
+
+
+def load_history(ticker: str) -> Tuple[pd.DataFrame, Optional[dict]]:
+    path = _path(ticker)
+    if not os.path.exists(path):
+        return _empty_frame(), None
+    try:
+        table = pq.read_table(path)
+    except Exception:
+        return _empty_frame(), None
+    meta = table.schema.metadata or {}
+    coverage = json.loads(meta[_META_KEY]) if _META_KEY in meta else None
+    df = table.to_pandas()
+    if coverage is None:
+        return df, None
+    return df, {"start": pd.Timestamp(coverage["start"]),
+                "end": pd.Timestamp(coverage["end"]),
+                "fetched_at": pd.Timestamp(coverage["fetched_at"])}
+
+
+def save_history(ticker: str, df: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp):
+    os.makedirs(STORE_DIR, exist_ok=True)
+    table = pa.Table.from_pandas(df[COLUMNS].astype(float), preserve_index=True)
+    coverage = {"start": start.isoformat(), "end": end.isoformat(), "fetched_at": pd.Timestamp.now().isoformat()}
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), _META_KEY: json.dumps(coverage).encode()})
+    path = _path(ticker)
+    fd, tmp = tempfile.mkstemp(dir=STORE_DIR, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pq.write_table(table, f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _ticker_lock(ticker: str) -> threading.Lock:
+    with _MEMORY_LOCK:
+        return _TICKER_LOCKS.setdefault(ticker, threading.Lock())
+
+
+def _mtime(ticker: str) -> Optional[float]:
+    try:
+        return os.path.getmtime(_path(ticker))
+    except OSError:
+        return None
+
+
+def cached_history(ticker: str) -> Tuple[pd.DataFrame, Optional[dict]]:
+    mtime = _mtime(ticker)
+    with _MEMORY_LOCK:
+        hit = _MEMORY.get(ticker)
+    if hit is not None and hit[2] == mtime:
+        return hit[0], hit[1]
+    df, coverage = load_history(ticker)
+    if coverage is not None:
+        with _MEMORY_LOCK:
+            _MEMORY[ticker] = (df, coverage, mtime)
+    return df, coverage
+
+
+def _remember(ticker: str, df: pd.DataFrame, coverage: dict):
+    save_history(ticker, df, coverage["start"], coverage["end"])
+    with _MEMORY_LOCK:
+        _MEMORY[ticker] = (df, coverage, _mtime(ticker))
+
+
+def missing_ranges(coverage: Optional[dict], start: pd.Timestamp, end: pd.Timestamp) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    if coverage is None:
+        return [(start, end)]
+    gaps = []
+    if start < coverage["start"]:
+        gaps.append((start, coverage["start"]))
+    if end > coverage["end"]:
+        fresh = pd.Timestamp.now() - coverage["fetched_at"] < TAIL_REFRESH
+        if not (fresh and coverage["end"] >= pd.Timestamp.today().normalize()):
+            gaps.append((coverage["end"], end))
+    return gaps
+
+
+def _complete_bars(df: pd.DataFrame, coverage: dict) -> pd.DataFrame:
+    # bars dated on the day they were fetched may still be intraday snapshots
+    return df.loc[df.index < coverage["fetched_at"].normalize()]
+
+
+def _with_overlap(df: pd.DataFrame, coverage: Optional[dict], gap: Tuple[pd.Timestamp, pd.Timestamp]) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    if coverage is None or gap[0] != coverage["end"] or df.empty:
+        return gap
+    complete = _complete_bars(df, coverage)
+    if complete.empty:
+        return gap
+    return min(gap[0], complete.index[-min(OVERLAP_BARS, len(complete))].normalize()), gap[1]
+
+
+def _overlap_matches(old: pd.DataFrame, new: pd.DataFrame, coverage: Optional[dict]) -> bool:
+    if coverage is None or old.empty or new.empty:
+        return True
+    complete = _complete_bars(old, coverage)
+    common = complete.index.intersection(new.index)
+    if common.empty:
+        return True
+    return np.allclose(new.loc[common, "Close"].to_numpy(dtype=float), complete.loc[common, "Close"].to_numpy(dtype=float),
+                       rtol=OVERLAP_RTOL, equal_nan=True)
+
+
+def _fetch_group(fetch, group: List[str], start: pd.Timestamp, end: pd.Timestamp, failed: Optional[List[str]]) -> Dict[str, pd.DataFrame]:
+    try:
+        fetched = fetch(group, start, end)
+    except FetchError:
+        if failed is not None:
+            failed.extend(group)
+        return {}
+    if failed is not None:
+        failed.extend(t for t in group if t not in fetched)
+    return {t: fetched[t] if fetched[t] is not None else _empty_frame() for t in group if t in fetched}
+
+
+def _merge(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    if old is None or old.empty:
+        return new.sort_index()
+    if new is None or new.empty:
+        return old
+    merged = pd.concat([old, new])
+    merged = merged.loc[~merged.index.duplicated(keep="last")]
+    return merged.sort_index()
+
+
+def read_prices(tickers: List[str], start: pd.Timestamp, end: pd.Timestamp,
+                fetch: Callable[[List[str], pd.Timestamp, pd.Timestamp], Dict[str, pd.DataFrame]],
+                failed: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+    start = pd.Timestamp(start).normalize()
+    end = pd.Timestamp(end).normalize()
+    today = pd.Timestamp.today().normalize()
+    tickers = list(dict.fromkeys(tickers))
+
+    history = {}
+    coverage = {}
+    with ExitStack() as stack:
+        for t in sorted(tickers):
+            stack.enter_context(_ticker_lock(t))
+
+        requests = {}
+        for t in tickers:
+            history[t], coverage[t] = cached_history(t)
+            for gap in missing_ranges(coverage[t], start, end):
+                requests.setdefault(_with_overlap(history[t], coverage[t], gap), []).append(t)
+
+        # a tail whose overlapping closes moved means the stored bars were re-adjusted (e.g. a split): reload them all
+        reloads = {}
+        for (gap_start, gap_end), group in requests.items():
+            for t, new in _fetch_group(fetch, group, gap_start, gap_end, failed).items():
+                cov = coverage[t]
+                if not _overlap_matches(history[t], new, cov):
+                    reloads.setdefault((min(start, cov["start"]), max(end, cov["end"])), []).append(t)
+                    continue
+                history[t] = _merge(history[t], new)
+                cov_start = min(gap_start, cov["start"]) if cov else gap_start
+                cov_end = max(min(gap_end, today), cov["end"]) if cov else min(gap_end, today)
+                coverage[t] = {"start": cov_start, "end": cov_end, "fetched_at": pd.Timestamp.now()}
+                _remember(t, history[t], coverage[t])
+
+        for (reload_start, reload_end), group in reloads.items():
+            for t, new in _fetch_group(fetch, group, reload_start, reload_end, failed).items():
+                if new.empty:
+                    continue
+                history[t] = new.sort_index()
+                coverage[t] = {"start": reload_start, "end": min(reload_end, today), "fetched_at": pd.Timestamp.now()}
+                _remember(t, history[t], coverage[t])
+
+    out = {}
+    for t, df in history.items():
+        if df is None or df.empty:
+            out[t] = _empty_frame()
+            continue
+        window = df.loc[(df.index >= start) & (df.index < end), COLUMNS]
+        out[t] = window if not window.empty else _empty_frame()
+    return out
@@ -0,0 +1,321 @@
+import os
+import zlib
+import argparse
+import threading
+from abc import ABC, abstractmethod
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from yahooquery import Ticker as yqt
+from typing import Dict, List, Optional
+
+PRICE_COLUMNS = ["High", "Low", "Close"]
+STATEMENTS = ["income", "income_q", "balance", "cashbflow"]
+_YF_DOWNLOAD_LOCK = threading.Lock()
+
+
+class MarketDataProvider(ABC):
+    name = "base"
+    remote = False
+
+    @abstractmethod
+    def price_history(self, tickers: List[str], start: pd.Timestamp, end: pd.Timestamp) -> Dict[str, pd.DataFrame]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def dividends(self, ticker: str) -> pd.Series:
+        raise NotImplementedError
+
+    @abstractmethod
+    def fundamentals(self, ticker: str) -> dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def profile(self, ticker: str) -> dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def live_quote(self, ticker: str) -> Optional[float]:
+        raise NotImplementedError
+
+    def live_quotes(self, tickers: List[str]) -> Dict[str, Optional[float]]:
+        quotes = {}
+        for t in tickers:
+            try:
+                quotes[t] = self.live_quote(t)
+            except Exception:
+                quotes[t] = None
+        return quotes
+
+
+def _empty_prices() -> pd.DataFrame:
+    return pd.DataFrame(columns=PRICE_COLUMNS)
+
+
+def _split_batch(raw: pd.DataFrame, ticker: str) -> pd.DataFrame:
+    if raw is None or raw.empty or not isinstance(raw.columns, pd.MultiIndex):
+        return _empty_prices()
+    if ticker not in raw.columns.get_level_values(0):
+        return _empty_prices()
+    df = raw[ticker][PRICE_COLUMNS].dropna(how="all").sort_index()
+    if df.empty:
+        return _empty_prices()
+    df.columns = PRICE_COLUMNS
+    return df
+
+
+def _is_no_data(error) -> bool:
+    text = str(error).lower()
+    return any(k in text for k in ("delisted", "no data", "no price data", "not found")) and "timezone" not in text
+
+
+class YahooProvider(MarketDataProvider):
+    name = "yahoo"
+    remote = True
+
+    def price_history(self, tickers, start, end):
+        with _YF_DOWNLOAD_LOCK:
+            raw = yf.download(list(tickers), start=start, end=end, progress=False, auto_adjust=False, group_by="ticker", threads=True)
+            errors = dict(getattr(yf.shared, "_ERRORS", None) or {})
+        out = {t: _split_batch(raw, t) for t in tickers}
+        failed = [t for t in tickers if out[t].empty and t in errors and not _is_no_data(errors[t])]
+        if failed and all(out[t].empty for t in tickers):
+            raise RuntimeError(f"price download failed for {', '.join(failed)}: {errors[failed[0]]}")
+        for t in failed:
+            del out[t]
+        return out
+
+    def dividends(self, ticker):
+        try:
+            hist = yf.Ticker(ticker).history(period="max", actions=True, auto_adjust=False, raise_errors=True)
+        except Exception as e:
+            if _is_no_data(e):
+                return pd.Series(dtype=float)
+            raise
+        if hist is None or hist.empty:
+            raise RuntimeError(f"empty history response for {ticker}")
+        if "Dividends" not in hist.columns:
+            return pd.Series(dtype=float)
+        div = hist["Dividends"]
+        return div[div != 0].sort_index()
+
+    def fundamentals(self, ticker):
+        t = yf.Ticker(ticker)
+        data = {"income": t.income_stmt,
+                "income_q": t.quarterly_income_stmt,
+                "balance": t.balance_sheet,
+                "cashbflow": t.cashflow,
+                "s_o": t.get_shares_full()}
+        if all(data[k] is None or data[k].empty for k in STATEMENTS):
+            # yfinance swallows statement errors, so probe the symbol: a failed request raises here, while a
+            # reachable symbol without statements (ETFs, indices) is a valid no-data answer
+            try:
+                t.history(period="5d", raise_errors=True)
+            except Exception as e:
+                if not _is_no_data(e):
+                    raise
+        return data
+
+    def profile(self, ticker):
+        profile = yqt(ticker).summary_profile
+        if profile is None or not isinstance(profile, dict):
+            return {"Sector": "Unknown", "Industry": "Unknown"}
+        data = profile.get(ticker, {})
+        if not isinstance(data, dict):
+            return {"Sector": "Unknown", "Industry": "Unknown"}
+        return {"Sector": data.get("sector", "Unknown"),
+                "Industry": data.get("industry", "Unknown")}
+
+    def live_quote(self, ticker):
+        return float(yf.Ticker(ticker).fast_info["last_price"])
+
+    def live_quotes(self, tickers):
+        prices = yqt(list(tickers)).quotes
+        if not isinstance(prices, dict):
+            raise RuntimeError(f"quote request failed: {prices}")
+        quotes = {}
+        for t in tickers:
+            data = prices.get(t)
+            last = data.get("regularMarketPrice") if isinstance(data, dict) else None
+            quotes[t] = float(last) if isinstance(last, (int, float)) else None
+        return quotes
+
+
+def _file_name(ticker: str) -> str:
+    return "".join(c if c.isalnum() or c in "._-" else "_" for c in ticker)
+
+
+class LocalProvider(MarketDataProvider):
+    """Serves market data from fixture files laid out by `generate_fixtures`:
+    prices/<T>.parquet|csv, dividends/<T>.csv, fundamentals/<T>/<statement>.csv and profiles.csv."""
+
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _find(self, *parts) -> Optional[str]:
+        base = os.path.join(self.root, *parts)
+        for ext in (".parquet", ".csv"):
+            if os.path.exists(base + ext):
+                return base + ext
+        return None
+
+    def _read(self, path: str) -> pd.DataFrame:
+        if path.endswith(".parquet"):
+            return pd.read_parquet(path)
+        return pd.read_csv(path, index_col=0, parse_dates=True)
+
+    def price_history(self, tickers, start, end):
+        out = {}
+        for t in tickers:
+            path = self._find("prices", _file_name(t))
+            if path is None:
+                out[t] = _empty_prices()
+                continue
+            df = self._read(path)[PRICE_COLUMNS].astype(float).sort_index()
+            df = df.loc[(df.index >= pd.Timestamp(start)) & (df.index < pd.Timestamp(end))]
+            out[t] = df if not df.empty else _empty_prices()
+        return out
+
+    def dividends(self, ticker):
+        path = self._find("dividends", _file_name(ticker))
+        if path is None:
+            return pd.Series(dtype=float)
+        return self._read(path).iloc[:, 0].astype(float).sort_index()
+
+    def fundamentals(self, ticker):
+        folder = os.path.join(self.root, "fundamentals", _file_name(ticker))
+        if not os.path.isdir(folder):
+            return {}
+        out = {}
+        for key in STATEMENTS:
+            path = os.path.join(folder, f"{key}.csv")
+            if os.path.exists(path):
+                df = pd.read_csv(path, index_col=0)
+                df.columns = pd.to_datetime(df.columns)
+                out[key] = df
+        path = os.path.join(folder, "s_o.csv")
+        if os.path.exists(path):
+            s_o = pd.read_csv(path, index_col=0).iloc[:, 0]
+            s_o.index = pd.to_datetime(s_o.index, utc=True)
+            out["s_o"] = s_o
+        return out
+
+    def profile(self, ticker):
+        path = os.path.join(self.root, "profiles.csv")
+        if os.path.exists(path):
+            profiles = pd.read_csv(path, index_col="Symbol")
+            if ticker in profiles.index:
+                row = profiles.loc[ticker]
+                return {"Sector": row.get("Sector", "Unknown"), "Industry": row.get("Industry", "Unknown")}
+        return {"Sector": "Unknown", "Industry": "Unknown"}
+
+    def live_quote(self, ticker):
+        path = self._find("prices", _file_name(ticker))
+        if path is None:
+            return None
+        return float(self._read(path)["Close"].dropna().iloc[-1])
+
+
+def _rng(ticker: str, seed: int) -> np.random.Generator:
+    return np.random.default_rng([seed, zlib.crc32(ticker.encode())])
+
+
+def _synthetic_statements(rng: np.random.Generator, end: pd.Timestamp, shares_out: float) -> dict:
+    years = pd.DatetimeIndex([pd.Timestamp(year=end.year - i, month=3, day=31) for i in range(1, 5)])
+    quarters = pd.date_range(end=end, periods=5, freq="QE")[::-1]
+    revenue = rng.uniform(5e10, 5e11) * np.cumprod(np.r_[1.0, 1 / (1 + rng.normal(0.1, 0.05, 3))])
+    margin = rng.uniform(0.05, 0.25)
+    net_income = revenue * margin
+    assets = revenue * rng.uniform(1.0, 2.5)
+    equity = assets * rng.uniform(0.3, 0.7)
+
+    income = pd.DataFrame({"Total Revenue": revenue,
+                           "Net Income": net_income,
+                           "EBIT": net_income * 1.35,
+                           "Operating Income": net_income * 1.3,
+                           "Interest Expense": net_income * rng.uniform(0.02, 0.2)}, index=years).T
+    income_q = pd.DataFrame({"Total Revenue": np.repeat(revenue[0] / 4, 5),
+                             "Net Income": net_income[0] / 4 * rng.normal(1.0, 0.08, 5)}, index=quarters).T
+    balance = pd.DataFrame({"Total Assets": assets,
+                            "Stockholders Equity": equity,
+                            "Total Debt": (assets - equity) * rng.uniform(0.2, 0.6),
+                            "Current Assets": assets * 0.4,
+                            "Current Liabilities": assets * 0.25,
+                            "Cash And Cash Equivalents": assets * rng.uniform(0.03, 0.15)}, index=years).T
+    cashflow = pd.DataFrame({"Operating Cash Flow": net_income * 1.2,
+                             "Capital Expenditure": -revenue * 0.05,
+                             "Free Cash Flow": net_income * 1.2 - revenue * 0.05}, index=years).T
+    s_o = pd.Series(shares_out, index=pd.date_range(end=end, periods=8, freq="QE", tz="UTC"), name="shares")
+    return {"income": income, "income_q": income_q, "balance": balance, "cashbflow": cashflow, "s_o": s_o}
+
+
+def generate_fixtures(root: str, tickers: List[str], start="2018-01-01", end=None, seed: int = 0, fmt: str = "parquet"):
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp.today().normalize()
+    index = pd.bdate_range(start, end, name="Date")
+    for sub in ("prices", "dividends", "fundamentals"):
+        os.makedirs(os.path.join(root, sub), exist_ok=True)
+
+    profiles = []
+    sectors = ["Financial Services", "Technology", "Energy", "Consumer Defensive", "Healthcare", "Industrials"]
+    for t in tickers:
+        rng = _rng(t, seed)
+        mu, sigma = rng.uniform(0.0, 0.2), rng.uniform(0.15, 0.45)
+        log_rtn = rng.normal(mu / 252 - sigma ** 2 / 504, sigma / np.sqrt(252), len(index))
+        close = rng.uniform(100, 3000) * np.exp(np.cumsum(log_rtn))
+        spread = np.abs(rng.normal(0, sigma / np.sqrt(252), len(index))) * close
+        prices = pd.DataFrame({"High": close + spread, "Low": close - spread, "Close": close}, index=index)
+        name = _file_name(t)
+        if fmt == "parquet":
+            prices.to_parquet(os.path.join(root, "prices", f"{name}.parquet"))
+        else:
+            prices.to_csv(os.path.join(root, "prices", f"{name}.csv"))
+
+        if t.startswith("^"):
+            continue
+
+        pay_dates = index[::126][1:]
+        dividends = pd.Series(close[index.get_indexer(pay_dates)] * rng.uniform(0.0, 0.015), index=pay_dates, name="Dividends")
+        dividends.to_csv(os.path.join(root, "dividends", f"{name}.csv"))
+
+        folder = os.path.join(root, "fundamentals", name)
+        os.makedirs(folder, exist_ok=True)
+        statements = _synthetic_statements(rng, end, shares_out=rng.uniform(1e8, 5e9))
+        for key, frame in statements.items():
+            frame.to_csv(os.path.join(folder, f"{key}.csv"))
+
+        sector = sectors[int(rng.integers(len(sectors)))]
+        profiles.append({"Symbol": t, "Sector": sector, "Industry": f"{sector} - General"})
+
+    pd.DataFrame(profiles, columns=["Symbol", "Sector", "Industry"]).to_csv(os.path.join(root, "profiles.csv"), index=False)
+
+
+_PROVIDER = None
+
+
+def get_provider() -> MarketDataProvider:
+    global _PROVIDER
+    if _PROVIDER is None:
+        if os.getenv("MARKET_DATA_PROVIDER", "yahoo").lower() == "local":
+            _PROVIDER = LocalProvider(os.getenv("MARKET_DATA_FIXTURES", "fixtures"))
+        else:
+            _PROVIDER = YahooProvider()
+    return _PROVIDER
+
+
+def set_provider(provider: MarketDataProvider):
+    global _PROVIDER
+    _PROVIDER = provider
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate deterministic offline market data fixtures.")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--root", default="fixtures")
+    parser.add_argument("--start", default="2018-01-01")
+    parser.add_argument("--end", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+    args = parser.parse_args()
+    generate_fixtures(args.root, args.tickers, args.start, args.end, args.seed, args.format)
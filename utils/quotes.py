@@ -0,0 +1,48 @@
+import time
+import threading
+import streamlit as st
+from typing import Dict, List, Optional
+from utils.providers import get_provider
+from utils.resilience import FetchError, resilient_call
+
+QUOTE_TTL = 15
+
+
+class QuoteCache:
+    def __init__(self, ttl: float = QUOTE_TTL):
+        self.ttl = ttl
+        self._quotes = {}
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+
+    def _stale(self, tickers: List[str]) -> List[str]:
+        now = time.monotonic()
+        with self._lock:
+            return [t for t in tickers if t not in self._quotes or now - self._quotes[t][1] > self.ttl]
+
+    def get(self, tickers: List[str]) -> Dict[str, Optional[float]]:
+        tickers = list(dict.fromkeys(tickers))
+        if self._stale(tickers):
+            with self._fetch_lock:
+                stale = self._stale(tickers)
+                if stale:
+                    try:
+                        fetched = resilient_call("quote", get_provider().live_quotes, stale, retries=0)
+                    except FetchError:
+                        fetched = None
+                    if fetched is not None:
+                        now = time.monotonic()
+                        with self._lock:
+                            for t in stale:
+                                self._quotes[t] = (fetched.get(t), now)
+        with self._lock:
+            return {t: self._quotes[t][0] if t in self._quotes else None for t in tickers}
+
+
+@st.cache_resource(show_spinner=False)
+def get_quote_cache() -> QuoteCache:
+    return QuoteCache(QUOTE_TTL)
+
+
+def live_prices(tickers: List[str]) -> Dict[str, Optional[float]]:
+    return get_quote_cache().get(tickers)
@@ -0,0 +1,44 @@
+import threading
+import streamlit as st
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+REPORT_WORKERS = 1
+MAX_REPORTS = 16
+
+
+class ReportJobs:
+    """Builds report artifacts on a background worker. Futures are kept per input hash in a small LRU, so a repeat
+    request for the same inputs is served from the finished result instead of being rebuilt."""
+
+    def __init__(self, workers: int = REPORT_WORKERS, max_entries: int = MAX_REPORTS):
+        self.max_entries = max_entries
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[Future]:
+        with self._lock:
+            future = self._jobs.get(key)
+            if future is not None:
+                self._jobs.move_to_end(key)
+            return future
+
+    def submit(self, key, func: Callable, *args) -> Future:
+        with self._lock:
+            future = self._jobs.get(key)
+            if future is not None and not (future.done() and future.exception() is not None):
+                self._jobs.move_to_end(key)
+                return future
+            future = self._pool.submit(func, *args)
+            self._jobs[key] = future
+            finished = [k for k, f in self._jobs.items() if f.done()]
+            while len(self._jobs) > self.max_entries and finished:
+                del self._jobs[finished.pop(0)]
+            return future
+
+
+@st.cache_resource(show_spinner=False)
+def get_report_jobs() -> ReportJobs:
+    return ReportJobs(REPORT_WORKERS, MAX_REPORTS)
@@ -0,0 +1,90 @@
+import time
+import random
+import threading
+from typing import Callable, Dict
+
+RETRIES = 2
+BASE_DELAY = 0.5
+MAX_DELAY = 8.0
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 60.0
+
+
+class FetchError(Exception):
+    """The endpoint could not be reached or answered with an error (as opposed to having no data)."""
+
+
+class CircuitOpenError(FetchError):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def breaker(endpoint: str) -> CircuitBreaker:
+    with _BREAKERS_LOCK:
+        if endpoint not in _BREAKERS:
+            _BREAKERS[endpoint] = CircuitBreaker(endpoint)
+        return _BREAKERS[endpoint]
+
+
+def resilient_call(endpoint: str, func: Callable, *args, retries: int = RETRIES, **kwargs):
+    circuit = breaker(endpoint)
+    last_error = None
+    for attempt in range(retries + 1):
+        if not circuit.allow():
+            raise CircuitOpenError(f"{endpoint}: circuit open after repeated failures")
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            circuit.record_failure()
+            last_error = e
+        else:
+            circuit.record_success()
+            return result
+        if attempt < retries:
+            time.sleep(random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2 ** attempt)))
+    raise FetchError(f"{endpoint}: {last_error}") from last_error
@@ -0,0 +1,75 @@
+import streamlit as st
+from functools import wraps
+from typing import Callable, Dict, Tuple
+
+LIVE_REFRESH = 15
+
+
+def live_fragment(func: Callable, run_every=LIVE_REFRESH) -> Callable:
+    """Runs func as a fragment that refreshes itself every run_every seconds (never when None). Inside a hidden render it runs
+    inline instead, so no timer keeps redrawing into a container that has already been cleared.
+
+    Only the sections wrapped with this (the Overview and Risk metric tiles, the holdings table and the unrealized
+    P/L trend) follow live prices; everything else shows the snapshot taken at the last user interaction."""
+    fragment = st.fragment(func, run_every=run_every)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if st.session_state.get("hidden_render"):
+            return func(*args, **kwargs)
+        return fragment(*args, **kwargs)
+    return wrapper
+
+
+def persist(key: str, options=None) -> str:
+    """Key for a widget whose value should survive while its tab is not shown. A kept value that is no longer one of
+    options is dropped, so the widget falls back to its default."""
+    if options is not None and key in st.session_state and st.session_state[key] not in options:
+        del st.session_state[key]
+    st.session_state.setdefault("persisted_keys", set()).add(key)
+    st.session_state.setdefault("drawn_keys", set()).add(key)
+    return key
+
+
+class TabScheduler:
+    """Renders only the selected tab on each rerun. Outputs are kept in session state per data version, so a tab
+    that needs another tab's output reuses it, or computes it once in a throwaway container if it was never shown."""
+
+    def __init__(self, version):
+        outputs = st.session_state.get("tab_outputs")
+        if outputs is None or outputs.get("version") != version:
+            outputs = {"version": version, "results": {}}
+            st.session_state.tab_outputs = outputs
+        self.results = outputs["results"]
+        self.tasks: Dict[str, Tuple[Callable, tuple]] = {}
+        st.session_state.drawn_keys = set()
+
+    def register(self, name: str, func: Callable, *args):
+        self.tasks[name] = (func, args)
+
+    def _draw(self, name: str):
+        func, args = self.tasks[name]
+        self.results[name] = func(*args)
+        return self.results[name]
+
+    def render(self, name: str):
+        try:
+            return self._draw(name)
+        finally:
+            # Streamlit drops the state of widgets that were not drawn in a run (st.rerun included); re-assigning
+            # the key keeps it as plain state
+            for key in st.session_state.get("persisted_keys", set()) - st.session_state.drawn_keys:
+                if key in st.session_state:
+                    st.session_state[key] = st.session_state[key]
+
+    def output(self, name: str):
+        if name not in self.results:
+            placeholder = st.empty()
+            st.session_state.hidden_render = True
+            try:
+                with placeholder.container():
+                    self._draw(name)
+            finally:
+                st.session_state.hidden_render = False
+            placeholder.empty()
+        return self.results[name]
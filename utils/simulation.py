@@ -0,0 +1,104 @@
+import os
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+HORIZONS = (1, 5, 21, 63, 252)
+CONFIDENCE = 0.95
+CHUNK_PATHS = 10_000
+PARALLEL_MIN_WORK = 50_000_000
+
+
+def _cholesky(cov: np.ndarray) -> np.ndarray:
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        vals, vecs = np.linalg.eigh((cov + cov.T) / 2)
+        return vecs * np.sqrt(np.clip(vals, 0, None))
+
+
+def _segments(horizons) -> np.ndarray:
+    return np.diff(np.r_[0, horizons])
+
+
+def _gaussian_chunk(seed, n_paths, segments, mu, chol):
+    rng = np.random.default_rng(seed)
+    out = np.empty((n_paths, len(segments), len(mu)))
+    for k, days in enumerate(segments):
+        z = rng.standard_normal((n_paths, len(mu)))
+        out[:, k] = days * mu + np.sqrt(days) * (z @ chol.T)
+    return np.cumsum(out, axis=1)
+
+
+def _bootstrap_chunk(seed, n_paths, segments, prefix, block_size):
+    rng = np.random.default_rng(seed)
+    n_obs = (prefix.shape[0] - 1) // 2
+    out = np.zeros((n_paths, len(segments), prefix.shape[1]))
+    for k, days in enumerate(segments):
+        n_blocks = -(-days // block_size)
+        lengths = np.full(n_blocks, block_size)
+        lengths[-1] = days - block_size * (n_blocks - 1)
+        for length in np.unique(lengths):
+            count = int((lengths == length).sum())
+            starts = rng.integers(0, n_obs, size=(n_paths, count))
+            out[:, k] += (prefix[starts + length] - prefix[starts]).sum(axis=1)
+    return np.cumsum(out, axis=1)
+
+
+def _simulate_chunk(args):
+    method, seed, n_paths, segments, params, exposure = args
+    if method == "gaussian":
+        cum_log = _gaussian_chunk(seed, n_paths, segments, *params)
+    else:
+        cum_log = _bootstrap_chunk(seed, n_paths, segments, *params)
+    return np.expm1(cum_log) @ exposure
+
+
+def monte_carlo_var(log_returns: pd.DataFrame, shares: dict, latest_price: dict, horizons=HORIZONS, n_paths: int = 100_000,
+                    method: str = "gaussian", block_size: int = 10, confidence: float = CONFIDENCE, seed: int = None,
+                    chunk_paths: int = CHUNK_PATHS, workers: int = None) -> dict:
+    tickers = [t for t in log_returns.columns if shares.get(t) and latest_price.get(t)]
+    history = log_returns[tickers].dropna()
+    if not tickers or len(history) < 2:
+        return {"summary": pd.DataFrame(), "pnl": np.empty((0, len(horizons)))}
+
+    exposure = np.array([float(shares[t]) * float(latest_price[t]) for t in tickers])
+    total_value = float(exposure.sum())
+    horizons = tuple(sorted(set(int(h) for h in horizons)))
+    segments = _segments(horizons)
+
+    if method == "gaussian":
+        values = history.to_numpy(dtype=float)
+        params = (values.mean(axis=0), _cholesky(np.atleast_2d(np.cov(values, rowvar=False))))
+    elif method == "bootstrap":
+        values = history.to_numpy(dtype=float)
+        params = (np.vstack([np.zeros((1, len(tickers))), np.cumsum(np.vstack([values, values]), axis=0)]), max(1, min(int(block_size), len(history))))
+    else:
+        raise ValueError(f"unknown simulation method: {method}")
+
+    chunk_sizes = [min(chunk_paths, n_paths - i) for i in range(0, n_paths, chunk_paths)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    tasks = [(method, s, n, segments, params, exposure) for s, n in zip(seeds, chunk_sizes)]
+
+    steps = int(sum(-(-days // params[1]) for days in segments)) if method == "bootstrap" else len(horizons)
+    work = n_paths * len(tickers) * steps
+    workers = workers if workers is not None else min(len(tasks), os.cpu_count() or 1)
+    if workers > 1 and work >= PARALLEL_MIN_WORK:
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else None
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method)) as pool:
+            pnl = np.vstack(list(pool.map(_simulate_chunk, tasks)))
+    else:
+        pnl = np.vstack([_simulate_chunk(task) for task in tasks])
+
+    losses = -pnl
+    var = np.quantile(losses, confidence, axis=0)
+    cvar = np.array([losses[losses[:, k] >= var[k], k].mean() for k in range(len(horizons))])
+    label = f"{confidence:.0%}"
+    summary = pd.DataFrame({"Horizon (Days)": horizons,
+                            "Expected P/L (₹)": pnl.mean(axis=0),
+                            f"VaR {label} (₹)": var,
+                            f"CVaR {label} (₹)": cvar,
+                            f"VaR {label}": var / total_value,
+                            f"CVaR {label}": cvar / total_value})
+    return {"summary": summary, "pnl": pnl}
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+from typing import List, Tuple
+
+MARKET_COLUMN = "^NSEI"
+
+
+def worst_drawdown_windows(market_close: pd.Series, n: int = 5) -> List[Tuple[str, pd.Timestamp, pd.Timestamp]]:
+    close = market_close.dropna().astype(float)
+    if len(close) < 2:
+        return []
+    peak = close.cummax()
+    drawdown = close / peak - 1
+    episode = (drawdown == 0).cumsum()
+    troughs = drawdown.groupby(episode).idxmin()
+    depths = drawdown.loc[troughs.values]
+    depths = depths[depths < 0].nsmallest(n)
+
+    windows = []
+    for trough, depth in depths.items():
+        start = close.loc[:trough].idxmax()
+        windows.append((f"NIFTY {depth:.1%} ({start:%b %Y} – {trough:%b %Y})", start, trough))
+    return sorted(windows, key=lambda w: w[1])
+
+
+def stress_test(prices: pd.DataFrame, market_close: pd.Series, exposure: pd.Series, betas: pd.Series,
+                scenarios: List[Tuple[str, pd.Timestamp, pd.Timestamp]], mode: str = "realised") -> dict:
+    tickers = [t for t in exposure.index if t in prices.columns]
+    if not scenarios or not tickers:
+        return {"summary": pd.DataFrame(), "pnl": pd.DataFrame()}
+
+    panel = prices[tickers].join(market_close.rename(MARKET_COLUMN), how="outer").sort_index().ffill()
+    values = panel.to_numpy(dtype=float)
+    dates = panel.index.to_numpy()
+
+    names = [s[0] for s in scenarios]
+    starts = np.searchsorted(dates, np.array([pd.Timestamp(s[1]) for s in scenarios], dtype="datetime64[ns]"), side="right") - 1
+    ends = np.searchsorted(dates, np.array([pd.Timestamp(s[2]) for s in scenarios], dtype="datetime64[ns]"), side="right") - 1
+    valid = (starts >= 0) & (ends > starts)
+    starts, ends = np.clip(starts, 0, None), np.clip(ends, 0, None)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        moves = values[ends] / values[starts] - 1
+    moves[~valid] = np.nan
+    market_move = moves[:, -1]
+    realised = moves[:, :-1]
+    beta = betas.reindex(tickers).fillna(1.0).to_numpy(dtype=float)
+    beta_scaled = np.outer(market_move, beta)
+
+    shocks = beta_scaled if mode == "beta" else np.where(np.isnan(realised), beta_scaled, realised)
+    weights = exposure.reindex(tickers).to_numpy(dtype=float)
+    pnl = shocks * weights
+    total = np.nansum(pnl, axis=1)
+    total[~valid] = np.nan
+
+    summary = pd.DataFrame({"Scenario": names,
+                            "Start": [pd.Timestamp(dates[i]).date() if v else pd.Timestamp(s[1]).date() for i, v, s in zip(starts, valid, scenarios)],
+                            "End": [pd.Timestamp(dates[i]).date() if v else pd.Timestamp(s[2]).date() for i, v, s in zip(ends, valid, scenarios)],
+                            "NIFTY 50 Move": market_move,
+                            "Portfolio P/L (₹)": total,
+                            "Portfolio P/L %": total / weights.sum() if weights.sum() else np.nan})
+    return {"summary": summary, "pnl": pd.DataFrame(pnl, index=names, columns=tickers)}
@@ -0,0 +1,74 @@
+import re
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+MAX_PREFIX = 12
+_WORD = re.compile(r"[a-z0-9&]+")
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TickerIndex:
+    def __init__(self, tickers_df: pd.DataFrame):
+        self.df = tickers_df.reset_index(drop=True)
+        self.symbols = self.df["Symbol"].astype(str).str.lower().tolist()
+        self.names = self.df["Company Name"].astype(str).str.lower().tolist()
+        self.labels = (self.df["Symbol"].astype(str) + " — " + self.df["Company Name"].astype(str)).to_numpy()
+        self.exact = {s: i for i, s in enumerate(self.symbols)}
+
+        sym_prefix: Dict[str, List[int]] = {}
+        word_prefix: Dict[str, List[int]] = {}
+        trigrams: Dict[str, List[int]] = {}
+        for i, (sym, name) in enumerate(zip(self.symbols, self.names)):
+            for k in range(1, min(len(sym), MAX_PREFIX) + 1):
+                sym_prefix.setdefault(sym[:k], []).append(i)
+            seen = set()
+            for word in _WORD.findall(name):
+                for k in range(1, min(len(word), MAX_PREFIX) + 1):
+                    p = word[:k]
+                    if p not in seen:
+                        seen.add(p)
+                        word_prefix.setdefault(p, []).append(i)
+            for g in _trigrams(sym) | _trigrams(name):
+                trigrams.setdefault(g, []).append(i)
+
+        sym_len = np.array([len(s) for s in self.symbols])
+        order = lambda ids: np.array(sorted(ids, key=lambda i: (sym_len[i], self.symbols[i])), dtype=np.int32)
+        self.sym_prefix = {k: order(v) for k, v in sym_prefix.items()}
+        self.word_prefix = {k: order(v) for k, v in word_prefix.items()}
+        self.trigrams = {k: np.array(v, dtype=np.int32) for k, v in trigrams.items()}
+
+    def _substring(self, q: str) -> List[int]:
+        grams = sorted(_trigrams(q), key=lambda g: len(self.trigrams.get(g, ())))
+        if not grams or grams[0] not in self.trigrams:
+            return []
+        candidates = self.trigrams[grams[0]]
+        for g in grams[1:]:
+            candidates = np.intersect1d(candidates, self.trigrams.get(g, np.empty(0, dtype=np.int32)), assume_unique=True)
+            if candidates.size == 0:
+                return []
+        hits = [i for i in candidates.tolist() if q in self.symbols[i] or q in self.names[i]]
+        return sorted(hits, key=lambda i: (q not in self.symbols[i], len(self.symbols[i]), self.symbols[i]))
+
+    def search_ids(self, query: str, limit: int = 50) -> List[int]:
+        q = query.strip().lower()
+        if not q:
+            return []
+        ranked = []
+        if q in self.exact:
+            ranked.append(self.exact[q])
+        if len(q) <= MAX_PREFIX:
+            ranked.extend(self.sym_prefix.get(q, np.empty(0, dtype=np.int32))[:limit].tolist())
+            ranked.extend(self.word_prefix.get(q, np.empty(0, dtype=np.int32))[:limit].tolist())
+        if len(q) >= 3 and len(set(ranked)) < limit:
+            ranked.extend(self._substring(q))
+        return list(dict.fromkeys(ranked))[:limit]
+
+    def search(self, query: str, limit: int = 50) -> pd.DataFrame:
+        return self.df.iloc[self.search_ids(query, limit)]
+
+    def search_labels(self, query: str, limit: int = 50) -> List[str]:
+        return self.labels[self.search_ids(query, limit)].tolist()